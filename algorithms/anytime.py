@@ -0,0 +1,69 @@
+from queue import Queue
+from threading import Event, Thread
+
+INF = 100000000000
+
+
+class Incumbent:
+    def __init__(self, cost: int, solution: list, time: float) -> None:
+        self.cost = cost
+        self.solution = solution
+        self.time = time
+
+    def __repr__(self) -> str:
+        return f'Incumbent(cost={self.cost}, time={self.time:.3f})'
+
+
+class Callback:
+    def __init__(self, on_improvement=None, stop: Event = None) -> None:
+        self.on_improvement = on_improvement
+        self.stop = stop
+        self.offset = 0.0
+        self.best = INF
+        self.stopped = False
+
+    @classmethod
+    def wrap(cls, callback) -> 'Callback':
+        if isinstance(callback, Callback):
+            return callback
+        return cls(callback)
+
+    def __call__(self, cost: int, solution, time: float) -> bool:
+        if self.stopped:
+            return True
+        if self.stop is not None and self.stop.is_set():
+            self.stopped = True
+        elif cost < self.best:
+            self.best = cost
+            if self.on_improvement is not None:
+                solution = solution() if callable(solution) else solution
+                incumbent = Incumbent(int(cost), [int(x) for x in solution], self.offset + time)
+                self.stopped = bool(self.on_improvement(incumbent))
+        return self.stopped
+
+
+def anytime(solver, *params, **kwargs):
+    incumbents = Queue()
+    stop = Event()
+    result = []
+    errors = []
+
+    def run() -> None:
+        try:
+            result.append(solver.start(*params, callback=Callback(incumbents.put, stop), **kwargs))
+        except Exception as error:
+            errors.append(error)
+        finally:
+            incumbents.put(None)
+
+    thread = Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while (incumbent := incumbents.get()) is not None:
+            yield incumbent
+    finally:
+        stop.set()
+        thread.join()
+    if errors:
+        raise errors[0]
+    return result[0] if result else None
@@ -0,0 +1,166 @@
+import math
+import time
+from heapq import heappop, heappush
+
+import numpy as np
+
+from algorithms.anytime import Callback
+from algorithms.lagrangian_heuristics import LagrangianHeuristics
+from algorithms.repair import Repair
+from services.generation import Test
+from services.profiling import NULL_PROFILER, Profiler
+from services.progress import progress
+from services.trajectory import Trajectory
+
+INF = 100000000000
+EPSILON = 1e-6
+
+
+class Node:
+    def __init__(self, included: list, excluded: list, multipliers: np.ndarray, lower_bound: float) -> None:
+        self.included = included
+        self.excluded = excluded
+        self.multipliers = multipliers
+        self.lower_bound = lower_bound
+
+
+class BranchAndBound:
+    def __init__(self, test: Test, profiler: Profiler = None, record: bool = False) -> None:
+        self.name = 'branch_and_bound'
+        self.test = test
+        self.costs = test.covering_objects_costs.astype(np.int64)
+        self.profiler = profiler or NULL_PROFILER
+        self.record = record
+        self.trajectory: Trajectory | None = None
+        self.z_ub = INF
+        self.solution = np.zeros(test.count_covering_objects, dtype=np.int8)
+        self.lower_bound = 0
+        self.gap = 1.0
+        self.proven = False
+        self.count_nodes = 0
+
+    def start(self, count_iteration: int = 100, root_iteration: int = 1000, initial_solution=None,
+              time_limit: int = 300, visualization: bool = False, optimum=None, callback=None) -> tuple:
+        callback = Callback.wrap(callback)
+        start_time = time.time()
+        self.trajectory = Trajectory(self.test.count_covering_objects) if visualization or self.record else None
+        times = []
+        results = []
+        self.__update_incumbent(Repair(self.test, self.profiler).fix(np.zeros(self.test.count_covering_objects)))
+        if initial_solution is not None:
+            self.__update_incumbent(Repair(self.test, self.profiler).fix(initial_solution))
+        multipliers = np.minimum.reduceat(self.costs[self.test.covering_columns.indices],
+                                          self.test.covering_columns.indptr[:-1]).astype(np.float64)
+        nodes = [(0, 0, Node([], [], multipliers, 0))]
+        count = 0
+        pbar = progress()
+        while len(nodes) != 0:
+            lower_bound, _, node = heappop(nodes)
+            if lower_bound >= self.z_ub:
+                continue
+            self.count_nodes += 1
+            pbar.update(1)
+            with self.profiler.phase('bound'):
+                children = self.__bound(node, root_iteration if self.count_nodes == 1 else count_iteration)
+            for child in children:
+                if child.lower_bound < self.z_ub:
+                    count += 1
+                    heappush(nodes, (child.lower_bound, count, child))
+            self.lower_bound = min([self.z_ub] + [item[0] for item in nodes[:1]])
+            self.gap = (self.z_ub - self.lower_bound) / self.z_ub
+            if self.trajectory is not None:
+                self.trajectory.record(self.solution)
+            times.append(time.time() - start_time)
+            results.append(self.z_ub)
+            if callback(self.z_ub, self.solution, times[-1]):
+                break
+            if self.z_ub == optimum:
+                break
+            if times[-1] > time_limit:
+                break
+        pbar.close()
+        self.proven = self.lower_bound >= self.z_ub
+        if self.proven:
+            self.gap = 0.0
+        self.profiler.count('nodes', self.count_nodes)
+
+        if visualization:
+            from services.visualization import Video, IMAGE_SIZE
+            file_name = f'{self.name}_{count_iteration}_{root_iteration}'
+            video = Video(IMAGE_SIZE, self.test)
+            video.create_video(self.trajectory, file_name, times)
+        return results, times, self.solution.tolist()
+
+    def __bound(self, node: Node, count_iteration: int) -> list[Node]:
+        fixed = np.zeros(self.test.count_covering_objects, dtype=np.int8)
+        fixed[node.included] = 1
+        fixed_cost = int(self.costs @ fixed)
+        rows = np.flatnonzero(self.test.covering_columns.count(fixed) == 0)
+        free = np.ones(self.test.count_covering_objects, dtype=bool)
+        free[node.included] = False
+        free[node.excluded] = False
+        columns = np.flatnonzero(free)
+        if len(rows) == 0:
+            self.__update_incumbent(fixed)
+            return []
+        sub = self.test.subproblem(rows, columns)
+        if (sub.covering_columns.lengths() == 0).any():
+            return []
+
+        lagrange_alg = LagrangianHeuristics(sub, self.profiler)
+        lagrange_alg.t = node.multipliers[rows].copy()
+        lagrange_alg.z_ub = self.z_ub - fixed_cost
+        best_lb = -INF
+        best_t = lagrange_alg.t
+        f = 2
+        count_repetitions = 0
+        for _ in range(count_iteration):
+            z_lb, coefficients = lagrange_alg.calculate_z_lb()
+            if z_lb > best_lb + EPSILON:
+                best_lb = z_lb
+                best_t = lagrange_alg.t.copy()
+                count_repetitions = 0
+            else:
+                count_repetitions += 1
+                if count_repetitions % 20 == 0:
+                    f /= 2
+            if fixed_cost + math.ceil(best_lb - EPSILON) >= self.z_ub:
+                return []
+            s = lagrange_alg.find_solution()
+            cost = lagrange_alg.calculate_costs(s)
+            if cost < lagrange_alg.z_ub:
+                lagrange_alg.z_ub = cost
+                solution = fixed.copy()
+                solution[columns[s]] = 1
+                self.__update_incumbent(solution)
+            if fixed_cost + math.ceil(best_lb - EPSILON) >= self.z_ub:
+                return []
+            lagrange_alg.p = lagrange_alg.calculate_p(z_lb, coefficients)
+            subgradient = lagrange_alg.calculate_subgradient()
+            if not subgradient.any() or f < 0.005:
+                break
+            step_size = lagrange_alg.calculate_step_size(f, z_lb, subgradient)
+            lagrange_alg.t = lagrange_alg.update_lagrange_multipliers(step_size, subgradient)
+
+        with self.profiler.phase('branch'):
+            lower_bound = fixed_cost + math.ceil(best_lb - EPSILON)
+            multipliers = node.multipliers.copy()
+            multipliers[rows] = best_t
+            allowed = lagrange_alg.costs < INF
+            excluded = node.excluded + columns[~allowed].tolist()
+            lengths = sub.covering_columns.count(allowed)
+            if (lengths == 0).any():
+                return []
+            i = int(np.argmin(lengths))
+            candidates = sub.covering_columns[i]
+            candidates = candidates[allowed[candidates]]
+            coefficients = lagrange_alg.costs[candidates] - sub.rows_to_be_covered.dot(best_t)[candidates]
+            j = int(columns[candidates[np.argmin(coefficients)]])
+        return [Node(node.included + [j], excluded, multipliers, lower_bound),
+                Node(node.included, excluded + [j], multipliers, lower_bound)]
+
+    def __update_incumbent(self, solution: np.ndarray) -> None:
+        cost = int(self.costs @ solution)
+        if cost < self.z_ub:
+            self.z_ub = cost
+            self.solution = np.asarray(solution, dtype=np.int8).copy()
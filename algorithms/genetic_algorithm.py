@@ -1,81 +1,71 @@
 import time
-from random import randint, choice, random
-from tqdm import tqdm
+from random import randint, choice, random, getrandbits
 
+import numpy as np
+
+from algorithms.anytime import Callback
+from algorithms.repair import Repair
 from services.generation import Test
-from services.visualization import Video, IMAGE_SIZE
+from services.profiling import NULL_PROFILER, Profiler
+from services.progress import progress
+from services.trajectory import Trajectory
 
 
 class Chromosome:
     def __init__(self, genes: list | tuple, fitness_function_value: int, allowable: bool = True) -> None:
-        self.genes = tuple(genes)
+        self.genes = genes if isinstance(genes, int) else tuple(genes)
         self.fitness_function_value = fitness_function_value
         self.allowable = allowable
 
 
 class GeneticAlgorithm:
-    def __init__(self, test: Test) -> None:
+    def __init__(self, test: Test, bitset: bool = False, profiler: Profiler = None, record: bool = False) -> None:
         self.name = 'genetic_algorithm'
         self.test = test
         self.count_chromosomes = 0
         self.generation: list[Chromosome] = []
+        self.profiler = profiler or NULL_PROFILER
+        self.record = record
+        self.trajectory: Trajectory | None = None
+        self.repair = Repair(test, self.profiler)
+        self.max_cost = int(test.covering_objects_costs.sum())
+        self.bitset = Bitset(test) if bitset else None
 
     def start(self, count_chromosomes: int, mutation_frequency: float = 1, selection_percentage: tuple = (0, 0, 100),
               crossover_percentage: tuple = (0, 100, 0, 0), fine_rules: tuple = (0, 0),
               count_iteration: int = 1000, initial_population: list = None, consistency_of_result: int = 100,
               time_limit: int = 300,
-              visualization: bool = False, optimum=None) -> tuple:
-        self.count_chromosomes = count_chromosomes
-        selection = Selection(self.test.covering_objects_costs, count_chromosomes)
-        current_selection = selection.random
-        crossover = Crossover(self.test)
-        current_crossover = crossover.random
-        masks = []
+              visualization: bool = False, optimum=None, callback=None) -> tuple:
+        callback = Callback.wrap(callback)
+        self.trajectory = Trajectory(self.test.count_covering_objects) if visualization or self.record else None
         times = []
         results = []
         start_time = time.time()
         count_result_repetitions = 0
         count = 0
         result: Chromosome | list = []
-        fine_amount = fine_rules[0]
-        count_of_not_allowable = (fine_rules[1] * self.count_chromosomes) / 100
-        if initial_population is None:
-            self.__create_chromosomes(fine_amount, count_of_not_allowable)
-        else:
-            self.generation = [Chromosome(item, self.fitness_function(item)) for item in initial_population]
+        self.prepare(count_chromosomes, mutation_frequency, selection_percentage, crossover_percentage, fine_rules,
+                     count_iteration, initial_population)
+        if initial_population is not None:
             times.append(0)
 
-        pbar = tqdm(total=count_iteration, colour='GREEN')
+        pbar = progress(count_iteration)
         while count < count_iteration and count_result_repetitions < consistency_of_result:
             pbar.update(1)
             old_result = result
-            if round(count_iteration * sum(selection_percentage[:1]) / 100) == count:
-                current_selection = selection.proportional
-            if round(count_iteration * sum(selection_percentage[:2]) / 100) == count:
-                current_selection = selection.elite
-
-            if round(count_iteration * sum(crossover_percentage[:1]) / 100) == count:
-                current_crossover = crossover.one_point
-            if round(count_iteration * sum(crossover_percentage[:2]) / 100) == count:
-                current_crossover = crossover.two_point
-            if round(count_iteration * sum(crossover_percentage[:3]) / 100) == count:
-                current_crossover = crossover.uniform
-
-            # self.generation = current_selection(self.generation)
-            self.generation = self.__create_new_generation(current_crossover, mutation_frequency, fine_amount,
-                                                           count_of_not_allowable)
-            self.generation = current_selection(self.generation)
-            result = sorted([chromosome for chromosome in self.generation if chromosome.allowable],
-                            key=lambda x: self.calculate_cost(x.genes))[0]
+            result = self.evolve(count)
 
             if old_result == result:
                 count_result_repetitions += 1
             else:
                 count_result_repetitions = 0
-            masks.append(list(result.genes))
+            if self.trajectory is not None:
+                self.trajectory.record(self.decode(result.genes))
             times.append(time.time() - start_time)
             best_cost = self.calculate_cost(result.genes)
             results.append(best_cost)
+            if callback(best_cost, lambda: self.decode(result.genes), times[-1]):
+                break
             if best_cost == optimum:
                 break
             if count_result_repetitions > consistency_of_result:
@@ -85,24 +75,82 @@ class GeneticAlgorithm:
             count += 1
 
         if visualization:
+            from services.visualization import Video, IMAGE_SIZE
             file_name = (f'{self.name}_{count_chromosomes}_{str(selection_percentage)}_'
                          f'{count_iteration}_{consistency_of_result}')
             video = Video(IMAGE_SIZE, self.test)
-            video.create_video(masks, file_name)
+            video.create_video(self.trajectory, file_name, times)
         pbar.close()
-        return results, times, result.genes
+        return results, times, tuple(self.decode(result.genes))
+
+    def prepare(self, count_chromosomes: int, mutation_frequency: float, selection_percentage: tuple,
+                crossover_percentage: tuple, fine_rules: tuple, count_iteration: int,
+                initial_population: list = None) -> None:
+        self.count_chromosomes = count_chromosomes
+        self.mutation_frequency = mutation_frequency
+        self.selection_percentage = selection_percentage
+        self.crossover_percentage = crossover_percentage
+        self.count_iteration = count_iteration
+        self.selection = Selection(self.test.covering_objects_costs, count_chromosomes)
+        self.current_selection = self.selection.random
+        self.crossover = Crossover(self.test) if self.bitset is None else BitsetCrossover(self.test, self.bitset)
+        self.current_crossover = self.crossover.random
+        self.fine_amount = fine_rules[0]
+        self.count_of_not_allowable = (fine_rules[1] * self.count_chromosomes) / 100
+        if initial_population is None:
+            self.__create_chromosomes(self.fine_amount, self.count_of_not_allowable)
+        else:
+            if self.bitset is not None:
+                initial_population = [self.bitset.encode(item) for item in initial_population]
+            self.generation = [Chromosome(item, self.fitness_function(item)) for item in initial_population]
+
+    def evolve(self, count: int) -> Chromosome:
+        if round(self.count_iteration * sum(self.selection_percentage[:1]) / 100) == count:
+            self.current_selection = self.selection.proportional
+        if round(self.count_iteration * sum(self.selection_percentage[:2]) / 100) == count:
+            self.current_selection = self.selection.elite
+
+        if round(self.count_iteration * sum(self.crossover_percentage[:1]) / 100) == count:
+            self.current_crossover = self.crossover.one_point
+        if round(self.count_iteration * sum(self.crossover_percentage[:2]) / 100) == count:
+            self.current_crossover = self.crossover.two_point
+        if round(self.count_iteration * sum(self.crossover_percentage[:3]) / 100) == count:
+            self.current_crossover = self.crossover.uniform
+
+        with self.profiler.phase('new_generation'):
+            self.generation = self.__create_new_generation(self.current_crossover, self.mutation_frequency,
+                                                           self.fine_amount, self.count_of_not_allowable)
+        with self.profiler.phase('selection'):
+            self.generation = self.current_selection(self.generation)
+        with self.profiler.phase('best_chromosome'):
+            best = min([chromosome for chromosome in self.generation if chromosome.allowable],
+                       key=lambda x: self.calculate_cost(x.genes))
+        self.profiler.count('generations')
+        return best
+
+    def emigrants(self, count: int) -> list[Chromosome]:
+        return sorted(self.generation, key=lambda x: x.fitness_function_value, reverse=True)[:count]
+
+    def immigrate(self, chromosomes: list[Chromosome]) -> None:
+        if len(chromosomes) == 0:
+            return
+        self.generation.sort(key=lambda x: x.fitness_function_value, reverse=True)
+        self.generation[-len(chromosomes):] = chromosomes
 
     def __create_chromosomes(self, fine_amount: int, count_of_not_allowable: int) -> None:
         chromosomes = set()
         count = 0
         while len(chromosomes) < self.count_chromosomes:
-            genes = [randint(0, 1) for _ in range(self.test.count_covering_objects)]
+            if self.bitset is None:
+                genes = [randint(0, 1) for _ in range(self.test.count_covering_objects)]
+            else:
+                genes = getrandbits(self.test.count_covering_objects)
             count_fines = 0
             if fine_amount == 0 or count >= count_of_not_allowable:
                 genes = self.__mutation(genes)
             else:
                 count += 1
-                if 1 not in genes:
+                if self.is_empty(genes):
                     genes = self.__mutation(genes)
                 count_fines = self.calculate_fine(genes)
             chromosome = Chromosome(genes, self.fitness_function(genes) - count_fines * fine_amount, count_fines == 0)
@@ -112,8 +160,10 @@ class GeneticAlgorithm:
     def __create_new_generation(self, crossover, frequency: float, fine_amount: int,
                                 count_of_not_allowable: int) -> list:
         new_chromosomes = []
-        for i in range(0, self.count_chromosomes, 2):
-            new_chromosomes += crossover(list(self.generation[i].genes), list(self.generation[i + 1].genes))
+        with self.profiler.phase('crossover'):
+            for i in range(0, self.count_chromosomes, 2):
+                new_chromosomes += crossover(self.parent(self.generation[i].genes),
+                                             self.parent(self.generation[i + 1].genes))
         count = 0
         chromosomes = set(self.generation)
         for genes in new_chromosomes:
@@ -125,62 +175,89 @@ class GeneticAlgorithm:
                 genes = self.fix_chromosome(genes)
             else:
                 count += 1
-                if 1 not in genes:
+                if self.is_empty(genes):
                     genes = self.__mutation(genes)
                 count_fines = self.calculate_fine(genes)
             chromosome = Chromosome(genes, self.fitness_function(genes) - count_fines * fine_amount, count_fines == 0)
             chromosomes.add(chromosome)
         return list(chromosomes)
 
-    def __mutation(self, genes: list) -> list:
+    def __mutation(self, genes: list | int) -> list | int:
+        self.profiler.count('mutations')
         position = randint(0, self.test.count_covering_objects - 1)
+        if self.bitset is not None:
+            return genes ^ (1 << position)
         genes[position] = 1 - genes[position]
         return genes
 
-    def fix_chromosome(self, chromosome: list) -> list:
-        uncovered_objects = set()
-        columns_count_in_coverage = [0] * self.test.count_objects_to_be_covered
-        b: list[list[int]] = [[] for _ in range(self.test.count_covering_objects)]
-        a: list[list[int]] = [[] for _ in range(self.test.count_objects_to_be_covered)]
-
-        for i in range(self.test.count_objects_to_be_covered):
-            columns_count_in_coverage[i] = sum([x * y for x, y in zip(chromosome, self.test.coverage_array[i])])
-            if columns_count_in_coverage[i] == 0:
-                uncovered_objects.add(i)
-            for j in range(self.test.count_covering_objects):
-                if self.test.coverage_array[i][j] == 1:
-                    b[j].append(i)
-                    a[i].append(j)
-        while len(uncovered_objects) != 0:
-            i = list(uncovered_objects)[0]
-            j = sorted(a[i], key=lambda k: self.calculate_significance(k, uncovered_objects, b[k]))[0]
-            chromosome[j] = 1
-            for v in b[j]:
-                columns_count_in_coverage[v] += 1
-            uncovered_objects = uncovered_objects.difference(b[j])
-        for j in sorted([k for k in range(self.test.count_covering_objects) if chromosome[k] == 1],
-                        key=lambda x: -self.test.covering_objects_costs[x]):
-            if len([i for i in b[j] if columns_count_in_coverage[i] < 2]) == 0:
-                chromosome[j] = 0
-                for i in b[j]:
-                    columns_count_in_coverage[i] -= 1
-        return chromosome
-
-    def calculate_significance(self, k: int, uncovered_objects: set, j: set) -> float:
-        return self.test.covering_objects_costs[k] / len(uncovered_objects.intersection(j))
-
-    def calculate_fine(self, genes: list) -> int:
-        count_fines = 0
-        for object_to_be_covered in self.test.coverage_array:
-            if 1 not in [a * b for a, b in zip(genes, object_to_be_covered)]:
-                count_fines += 1
-        return count_fines
-
-    def calculate_cost(self, genes: list | tuple) -> int:
-        return sum([a * b for a, b in zip(genes, self.test.covering_objects_costs)])
-
-    def fitness_function(self, genes: list | tuple) -> int:
-        return sum(self.test.covering_objects_costs) - self.calculate_cost(genes) + 1
+    def fix_chromosome(self, chromosome: list | int) -> list | int:
+        if self.bitset is not None:
+            return self.bitset.encode(self.repair.fix(self.bitset.decode(chromosome)))
+        return self.repair.fix(chromosome).tolist()
+
+    def calculate_fine(self, genes: list | int) -> int:
+        if self.bitset is not None:
+            return self.bitset.count_uncovered(genes)
+        return int((self.test.covering_columns.count(genes) == 0).sum())
+
+    def calculate_cost(self, genes: list | tuple | int) -> int:
+        if self.bitset is not None:
+            return self.bitset.cost(genes)
+        return int(np.dot(genes, self.test.covering_objects_costs))
+
+    def fitness_function(self, genes: list | tuple | int) -> int:
+        self.profiler.count('evaluations')
+        return self.max_cost - self.calculate_cost(genes) + 1
+
+    def is_empty(self, genes: list | int) -> bool:
+        if self.bitset is not None:
+            return genes == 0
+        return 1 not in genes
+
+    def parent(self, genes: tuple | int) -> list | int:
+        if self.bitset is not None:
+            return genes
+        return list(genes)
+
+    def decode(self, genes: tuple | int) -> list:
+        if self.bitset is not None:
+            return self.bitset.decode(genes).tolist()
+        return list(genes)
+
+
+class Bitset:
+    def __init__(self, test: Test) -> None:
+        self.count = test.count_covering_objects
+        self.count_bytes = (self.count + 7) // 8
+        self.row_masks = [self.encode_indices(columns) for columns in test.covering_columns]
+        costs = np.zeros(self.count_bytes * 8, dtype=np.int64)
+        costs[:self.count] = test.covering_objects_costs
+        bits = (np.arange(256)[:, None] >> np.arange(8)) & 1
+        self.byte_costs = costs.reshape(self.count_bytes, 8) @ bits.T
+        self.byte_positions = np.arange(self.count_bytes)
+
+    def encode(self, genes) -> int:
+        packed = np.packbits(np.asarray(genes, dtype=np.uint8), bitorder='little')
+        return int.from_bytes(packed.tobytes(), 'little')
+
+    def encode_indices(self, indices) -> int:
+        genes = np.zeros(self.count, dtype=np.uint8)
+        genes[indices] = 1
+        return self.encode(genes)
+
+    def decode(self, genome: int) -> np.ndarray:
+        packed = np.frombuffer(genome.to_bytes(self.count_bytes, 'little'), dtype=np.uint8)
+        return np.unpackbits(packed, count=self.count, bitorder='little').astype(np.int8)
+
+    def random_mask(self, probability: float) -> int:
+        return self.encode(np.random.random(self.count) < probability)
+
+    def cost(self, genome: int) -> int:
+        packed = np.frombuffer(genome.to_bytes(self.count_bytes, 'little'), dtype=np.uint8)
+        return int(self.byte_costs[self.byte_positions, packed].sum())
+
+    def count_uncovered(self, genome: int) -> int:
+        return sum(1 for mask in self.row_masks if genome & mask == 0)
 
 
 class Selection:
@@ -244,8 +321,8 @@ class Crossover:
         return [new_chromosome_1, new_chromosome_2]
 
     def uniform(self, parent_1: tuple, parent_2: tuple) -> list:
-        cost_1 = sum([a * b for a, b in zip(parent_1, self.test.covering_objects_costs)])
-        cost_2 = sum([a * b for a, b in zip(parent_2, self.test.covering_objects_costs)])
+        cost_1 = int(np.dot(parent_1, self.test.covering_objects_costs))
+        cost_2 = int(np.dot(parent_2, self.test.covering_objects_costs))
         probability = cost_1 / (cost_1 + cost_2)
         parents = [parent_1, parent_2]
         new_chromosome_1 = [parents[random() < probability][i] for i in range(self.test.count_covering_objects)]
@@ -259,3 +336,45 @@ class Crossover:
         new_chromosome_2 = [parents[randint(0, 1)][i] for i in range(self.test.count_covering_objects)]
 
         return [new_chromosome_1, new_chromosome_2]
+
+
+class BitsetCrossover(Crossover):
+    def __init__(self, test, bitset: Bitset) -> None:
+        super().__init__(test)
+        self.bitset = bitset
+
+    def one_point(self, parent_1: int, parent_2: int) -> list:
+        separation = randint(2, self.test.count_covering_objects - 3)
+        low = (1 << separation) - 1
+        new_chromosome_1 = (parent_1 & low) | (parent_2 & ~low)
+        new_chromosome_2 = (parent_2 & low) | (parent_1 & ~low)
+
+        return [new_chromosome_1, new_chromosome_2]
+
+    def two_point(self, parent_1: int, parent_2: int) -> list:
+        separation_1 = randint(2, self.test.count_covering_objects - 3)
+        separation_2 = randint(separation_1, self.test.count_covering_objects - 2)
+        middle = ((1 << separation_2) - 1) ^ ((1 << separation_1) - 1)
+        new_chromosome_1 = (parent_1 & ~middle) | (parent_2 & middle)
+        new_chromosome_2 = (parent_2 & ~middle) | (parent_1 & middle)
+
+        return [new_chromosome_1, new_chromosome_2]
+
+    def uniform(self, parent_1: int, parent_2: int) -> list:
+        cost_1 = self.bitset.cost(parent_1)
+        cost_2 = self.bitset.cost(parent_2)
+        probability = cost_1 / (cost_1 + cost_2)
+        mask_1 = self.bitset.random_mask(probability)
+        mask_2 = self.bitset.random_mask(probability)
+        new_chromosome_1 = (parent_1 & ~mask_1) | (parent_2 & mask_1)
+        new_chromosome_2 = (parent_1 & ~mask_2) | (parent_2 & mask_2)
+
+        return [new_chromosome_1, new_chromosome_2]
+
+    def random(self, parent_1: int, parent_2: int) -> list:
+        mask_1 = getrandbits(self.test.count_covering_objects)
+        mask_2 = getrandbits(self.test.count_covering_objects)
+        new_chromosome_1 = (parent_1 & ~mask_1) | (parent_2 & mask_1)
+        new_chromosome_2 = (parent_1 & ~mask_2) | (parent_2 & mask_2)
+
+        return [new_chromosome_1, new_chromosome_2]
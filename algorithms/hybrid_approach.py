@@ -1,81 +1,192 @@
+import time
+from random import randint
+
+from algorithms.anytime import Callback
 from algorithms.black_hole import BlackHole
 from algorithms.genetic_algorithm import GeneticAlgorithm
 from algorithms.lagrangian_heuristics import LagrangianHeuristics
+from algorithms.local_search import LocalSearch
+from algorithms.parallel import ParallelRunner
 from algorithms.simulated_annealing import SimulatedAnnealing
 from services.generation import Test
+from services.profiling import Profiler
 
 
 class GA_SA:
-    def __init__(self, test: Test) -> None:
+    def __init__(self, test: Test, profiler: Profiler = None) -> None:
         self.test = test
+        self.profiler = profiler
 
     def start(self, count_chromosomes, mutation_frequency, selection_percentage, crossover_percentage, fine_rules,
-              count_iteration1, initial_temperature, count_iteration2, optimum=None):
-        genetic_alg = GeneticAlgorithm(self.test)
-        simulated_ann = SimulatedAnnealing(self.test)
+              count_iteration1, initial_temperature, count_iteration2, optimum=None, callback=None):
+        callback = Callback.wrap(callback)
+        start_time = time.time()
+        genetic_alg = GeneticAlgorithm(self.test, profiler=self.profiler)
+        simulated_ann = SimulatedAnnealing(self.test, profiler=self.profiler)
         res1 = genetic_alg.start(count_chromosomes, mutation_frequency, selection_percentage, crossover_percentage,
-                                 fine_rules, count_iteration1, time_limit=150, optimum=optimum)
+                                 fine_rules, count_iteration1, time_limit=150, optimum=optimum, callback=callback)
+        if callback.stopped:
+            return [res1[0], []], res1[1], res1[2]
+        callback.offset = time.time() - start_time
         res2 = simulated_ann.start(initial_temperature, count_iteration2, list(res1[2]), time_limit=150,
-                                   optimum=optimum)
+                                   optimum=optimum, callback=callback)
         return [res1[0], res2[0]], res1[1] + [res1[1][-1] + i for i in res2[1]], res2[2]
 
 
 class LH_SA:
-    def __init__(self, test: Test) -> None:
+    def __init__(self, test: Test, profiler: Profiler = None) -> None:
         self.test = test
-
-    def start(self, count_iteration1, initial_temperature, count_iteration2, optimum=None):
-        lagrange_alg = LagrangianHeuristics(self.test)
-        simulated_ann = SimulatedAnnealing(self.test)
-        res1 = lagrange_alg.start(count_iteration1, time_limit=150, optimum=optimum)
+        self.profiler = profiler
+
+    def start(self, count_iteration1, initial_temperature, count_iteration2, optimum=None, callback=None):
+        callback = Callback.wrap(callback)
+        start_time = time.time()
+        lagrange_alg = LagrangianHeuristics(self.test, profiler=self.profiler)
+        simulated_ann = SimulatedAnnealing(self.test, profiler=self.profiler)
+        res1 = lagrange_alg.start(count_iteration1, time_limit=150, optimum=optimum, callback=callback)
+        if callback.stopped:
+            return [res1[0], []], res1[1], res1[2]
+        callback.offset = time.time() - start_time
         res2 = simulated_ann.start(initial_temperature, count_iteration2, list(res1[2]), time_limit=150,
-                                   optimum=optimum)
+                                   optimum=optimum, callback=callback)
         return [res1[0], res2[0]], res1[1] + [res1[1][-1] + i for i in res2[1]], res2[2]
 
 
 class BH_SA:
-    def __init__(self, test: Test) -> None:
+    def __init__(self, test: Test, profiler: Profiler = None) -> None:
         self.test = test
-
-    def start(self, count_iteration1, count_stars, initial_temperature, count_iteration2, optimum=None):
-        black_hole_alg = BlackHole(self.test)
-        simulated_ann = SimulatedAnnealing(self.test)
-        res1 = black_hole_alg.start(count_iteration1, count_stars, True, time_limit=150, optimum=optimum)
+        self.profiler = profiler
+
+    def start(self, count_iteration1, count_stars, initial_temperature, count_iteration2, optimum=None,
+              callback=None):
+        callback = Callback.wrap(callback)
+        start_time = time.time()
+        black_hole_alg = BlackHole(self.test, profiler=self.profiler)
+        simulated_ann = SimulatedAnnealing(self.test, profiler=self.profiler)
+        res1 = black_hole_alg.start(count_iteration1, count_stars, True, time_limit=150, optimum=optimum,
+                                    callback=callback)
+        if callback.stopped:
+            return [res1[0], []], res1[1], res1[2]
+        callback.offset = time.time() - start_time
         res2 = simulated_ann.start(initial_temperature, count_iteration2, list(res1[2]), time_limit=150,
-                                   optimum=optimum)
+                                   optimum=optimum, callback=callback)
         return [res1[0], res2[0]], res1[1] + [res1[1][-1] + i for i in res2[1]], res2[2]
 
 
 class LH_BH:
-    def __init__(self, test: Test) -> None:
+    def __init__(self, test: Test, profiler: Profiler = None) -> None:
         self.test = test
-
-    def start(self, count_iteration1, count_iteration2, count_stars, optimum=None):
-        lagrange_alg = LagrangianHeuristics(self.test)
-        black_hole_alg = BlackHole(self.test)
-        res1 = lagrange_alg.start(count_iteration1, time_limit=30, optimum=optimum)
+        self.profiler = profiler
+
+    def start(self, count_iteration1, count_iteration2, count_stars, optimum=None, callback=None):
+        callback = Callback.wrap(callback)
+        start_time = time.time()
+        lagrange_alg = LagrangianHeuristics(self.test, profiler=self.profiler)
+        black_hole_alg = BlackHole(self.test, profiler=self.profiler)
+        res1 = lagrange_alg.start(count_iteration1, time_limit=30, optimum=optimum, callback=callback)
+        if callback.stopped:
+            return [res1[0], []], res1[1], res1[2]
+        callback.offset = time.time() - start_time
         res2 = black_hole_alg.start(count_iteration2, count_stars, True, res1[2], 200,
-                                    time_limit=270, optimum=optimum)
+                                    time_limit=270, optimum=optimum, callback=callback)
         return [res1[0], res2[0]], res1[1] + [res1[1][-1] + i for i in res2[1]], res2[2]
 
 
 class SA_GA:
-    def __init__(self, test: Test) -> None:
+    def __init__(self, test: Test, profiler: Profiler = None) -> None:
         self.test = test
+        self.profiler = profiler
 
     def start(self, initial_temperature, count_iteration1, count_chromosomes, mutation_frequency, selection_percentage,
-              crossover_percentage, fine_rules, count_iteration2, optimum=None):
-        simulated_ann = SimulatedAnnealing(self.test)
-        genetic_alg = GeneticAlgorithm(self.test)
-        initial_population = []
-        res1s = []
-        for _ in range(count_chromosomes):
-            res1 = simulated_ann.start(initial_temperature, count_iteration1, time_limit=150 / count_chromosomes,
-                                       optimum=optimum)
-            initial_population.append(res1[2])
-            res1s.append(res1)
+              crossover_percentage, fine_rules, count_iteration2, count_workers=1, optimum=None, callback=None):
+        callback = Callback.wrap(callback)
+        start_time = time.time()
+        simulated_ann = SimulatedAnnealing(self.test, profiler=self.profiler)
+        genetic_alg = GeneticAlgorithm(self.test, profiler=self.profiler)
+        if count_workers > 1:
+            runner = ParallelRunner(self.test, SimulatedAnnealing, count_workers)
+            res1s = runner.start([initial_temperature, count_iteration1], count_chromosomes, time_limit=150,
+                                 optimum=optimum, run_time_limit=150 * count_workers / count_chromosomes)
+        else:
+            res1s = []
+            for _ in range(count_chromosomes):
+                callback.offset = time.time() - start_time
+                res1s.append(simulated_ann.start(initial_temperature, count_iteration1,
+                                                 time_limit=150 / count_chromosomes, optimum=optimum,
+                                                 callback=callback))
+                if callback.stopped:
+                    res1 = min(res1s, key=lambda x: min(x[0]))
+                    return [res1[0], []], res1[1], res1[2]
+        initial_population = [res1[2] for res1 in res1s]
+        while len(initial_population) < count_chromosomes:
+            initial_population.append(
+                simulated_ann.fix_condition([randint(0, 1) for _ in range(self.test.count_covering_objects)]))
+        callback.offset = time.time() - start_time
 
         res2 = genetic_alg.start(count_chromosomes, mutation_frequency, selection_percentage, crossover_percentage,
-                                 fine_rules, count_iteration2, initial_population, time_limit=150, optimum=optimum)
+                                 fine_rules, count_iteration2, initial_population, time_limit=150, optimum=optimum,
+                                 callback=callback)
+        if len(res1s) == 0:
+            return [[], res2[0]], [callback.offset + i for i in res2[1]], res2[2]
         res1 = min(res1s, key=lambda x: min(x[0]))
         return [res1[0], [res1[0][-1]] + res2[0]], res1[1] + [res1[1][-1] + i for i in res2[1]], res2[2]
+
+
+class GA_LS:
+    def __init__(self, test: Test, profiler: Profiler = None) -> None:
+        self.test = test
+        self.profiler = profiler
+
+    def start(self, count_chromosomes, mutation_frequency, selection_percentage, crossover_percentage, fine_rules,
+              count_iteration1, count_iteration2, optimum=None, callback=None):
+        callback = Callback.wrap(callback)
+        start_time = time.time()
+        genetic_alg = GeneticAlgorithm(self.test, profiler=self.profiler)
+        local_search = LocalSearch(self.test, profiler=self.profiler)
+        res1 = genetic_alg.start(count_chromosomes, mutation_frequency, selection_percentage, crossover_percentage,
+                                 fine_rules, count_iteration1, time_limit=150, optimum=optimum, callback=callback)
+        if callback.stopped:
+            return [res1[0], []], res1[1], res1[2]
+        callback.offset = time.time() - start_time
+        res2 = local_search.start(count_iteration2, list(res1[2]), time_limit=150, optimum=optimum,
+                                  callback=callback)
+        return [res1[0], res2[0]], res1[1] + [res1[1][-1] + i for i in res2[1]], res2[2]
+
+
+class BH_LS:
+    def __init__(self, test: Test, profiler: Profiler = None) -> None:
+        self.test = test
+        self.profiler = profiler
+
+    def start(self, count_iteration1, count_stars, count_iteration2, optimum=None, callback=None):
+        callback = Callback.wrap(callback)
+        start_time = time.time()
+        black_hole_alg = BlackHole(self.test, profiler=self.profiler)
+        local_search = LocalSearch(self.test, profiler=self.profiler)
+        res1 = black_hole_alg.start(count_iteration1, count_stars, True, time_limit=150, optimum=optimum,
+                                    callback=callback)
+        if callback.stopped:
+            return [res1[0], []], res1[1], res1[2]
+        callback.offset = time.time() - start_time
+        res2 = local_search.start(count_iteration2, list(res1[2]), time_limit=150, optimum=optimum,
+                                  callback=callback)
+        return [res1[0], res2[0]], res1[1] + [res1[1][-1] + i for i in res2[1]], res2[2]
+
+
+class LH_LS:
+    def __init__(self, test: Test, profiler: Profiler = None) -> None:
+        self.test = test
+        self.profiler = profiler
+
+    def start(self, count_iteration1, count_iteration2, optimum=None, callback=None):
+        callback = Callback.wrap(callback)
+        start_time = time.time()
+        lagrange_alg = LagrangianHeuristics(self.test, profiler=self.profiler)
+        local_search = LocalSearch(self.test, profiler=self.profiler)
+        res1 = lagrange_alg.start(count_iteration1, time_limit=150, optimum=optimum, callback=callback)
+        if callback.stopped:
+            return [res1[0], []], res1[1], res1[2]
+        callback.offset = time.time() - start_time
+        res2 = local_search.start(count_iteration2, list(res1[2]), time_limit=150, optimum=optimum,
+                                  callback=callback)
+        return [res1[0], res2[0]], res1[1] + [res1[1][-1] + i for i in res2[1]], res2[2]
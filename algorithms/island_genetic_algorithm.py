@@ -0,0 +1,146 @@
+import random
+import time
+from multiprocessing import Pipe, Process
+
+import numpy as np
+
+from algorithms.anytime import Callback
+from algorithms.genetic_algorithm import GeneticAlgorithm
+from services.generation import Test
+from services.progress import progress
+from services.shared import shared
+from services.trajectory import Trajectory
+
+INF = 100000000000
+
+
+def run_island(connection, test: Test, bitset: bool, params: tuple, count_migrants: int, seed: int) -> None:
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+    genetic_alg = GeneticAlgorithm(test, bitset)
+    genetic_alg.prepare(*params)
+    count = 0
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        migrants, count_generations = message
+        genetic_alg.immigrate(migrants)
+        costs = []
+        best = None
+        for _ in range(count_generations):
+            result = genetic_alg.evolve(count)
+            count += 1
+            costs.append(genetic_alg.calculate_cost(result.genes))
+            if costs[-1] == min(costs):
+                best = result
+        connection.send((costs, best.genes, genetic_alg.emigrants(count_migrants)))
+    connection.close()
+
+
+class IslandGeneticAlgorithm:
+    def __init__(self, test: Test, bitset: bool = False, record: bool = False) -> None:
+        self.name = 'island_genetic_algorithm'
+        self.test = test
+        self.bitset = bitset
+        self.genetic_alg = GeneticAlgorithm(test, bitset)
+        self.record = record
+        self.trajectory: Trajectory | None = None
+
+    def start(self, count_islands: int, count_chromosomes: int, mutation_frequency: float = 1,
+              selection_percentage: tuple | list = (0, 0, 100), crossover_percentage: tuple | list = (0, 100, 0, 0),
+              fine_rules: tuple = (0, 0), count_iteration: int = 1000, migration_interval: int = 10,
+              count_migrants: int = 2, topology: str = 'ring', consistency_of_result: int = 100,
+              time_limit: int = 300, visualization: bool = False, seed: int = 0, optimum=None,
+              callback=None) -> tuple:
+        callback = Callback.wrap(callback)
+        if topology not in ('ring', 'random'):
+            raise ValueError(f'Unknown migration topology: {topology}')
+        selections = self.__per_island(selection_percentage, count_islands)
+        crossovers = self.__per_island(crossover_percentage, count_islands)
+        with shared(self.test) as test:
+            connections = []
+            processes = []
+            for i in range(count_islands):
+                connection, child_connection = Pipe()
+                params = (count_chromosomes, mutation_frequency, selections[i], crossovers[i], fine_rules,
+                          count_iteration)
+                process = Process(target=run_island,
+                                  args=(child_connection, test, self.bitset, params, count_migrants, seed + i),
+                                  daemon=True)
+                process.start()
+                connections.append(connection)
+                processes.append(process)
+
+            self.trajectory = Trajectory(self.test.count_covering_objects) if visualization or self.record else None
+            times = []
+            results = []
+            start_time = time.time()
+            count_result_repetitions = 0
+            count = 0
+            best_cost = INF
+            best_genes = None
+            migrants = [[] for _ in range(count_islands)]
+            pbar = progress(count_iteration)
+            while count < count_iteration and count_result_repetitions < consistency_of_result:
+                count_generations = min(migration_interval, count_iteration - count)
+                epoch_start = time.time() - start_time
+                for connection, chromosomes in zip(connections, migrants):
+                    connection.send((chromosomes, count_generations))
+                replies = [connection.recv() for connection in connections]
+                epoch_end = time.time() - start_time
+                pbar.update(count_generations)
+
+                for g in range(count_generations):
+                    result = min(reply[0][g] for reply in replies)
+                    if len(results) != 0 and results[-1] == result:
+                        count_result_repetitions += 1
+                    else:
+                        count_result_repetitions = 0
+                    results.append(result)
+                    times.append(epoch_start + (epoch_end - epoch_start) * (g + 1) / count_generations)
+                for costs, genes, _ in replies:
+                    if min(costs) < best_cost:
+                        best_cost = min(costs)
+                        best_genes = genes
+                if self.trajectory is not None:
+                    self.trajectory.record(self.genetic_alg.decode(best_genes))
+                migrants = self.__migrate([reply[2] for reply in replies], topology)
+                count += count_generations
+                if callback(best_cost, lambda: self.genetic_alg.decode(best_genes), times[-1]):
+                    break
+                if best_cost == optimum:
+                    break
+                if times[-1] > time_limit:
+                    break
+
+            for connection, process in zip(connections, processes):
+                connection.send(None)
+                process.join()
+        if visualization:
+            from services.visualization import Video, IMAGE_SIZE
+            file_name = (f'{self.name}_{count_islands}_{count_chromosomes}_{str(selection_percentage)}_'
+                         f'{count_iteration}_{consistency_of_result}')
+            video = Video(IMAGE_SIZE, self.test)
+            video.create_video(self.trajectory, file_name, times)
+        pbar.close()
+        return results, times, tuple(self.genetic_alg.decode(best_genes))
+
+    @staticmethod
+    def __per_island(percentage: tuple | list, count_islands: int) -> list:
+        if isinstance(percentage, list):
+            return [percentage[i % len(percentage)] for i in range(count_islands)]
+        return [percentage] * count_islands
+
+    @staticmethod
+    def __migrate(emigrants: list, topology: str) -> list:
+        count_islands = len(emigrants)
+        if count_islands == 1:
+            return [[]]
+        if topology == 'ring':
+            return [emigrants[i - 1] for i in range(count_islands)]
+        migrants = []
+        for i in range(count_islands):
+            j = random.randrange(count_islands - 1)
+            migrants.append(emigrants[j if j < i else j + 1])
+        return migrants
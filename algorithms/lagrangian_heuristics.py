@@ -1,123 +1,158 @@
 import time
 
-from tqdm import tqdm
 import math
+
+import numpy as np
+
+from algorithms.anytime import Callback
+from algorithms.repair import Repair
 from services.generation import Test
-from services.visualization import Video, IMAGE_SIZE
+from services.profiling import NULL_PROFILER, Profiler
+from services.progress import progress
+from services.trajectory import Trajectory
 
 INF = 100000000000
 
 
 class LagrangianHeuristics:
-    def __init__(self, test: Test) -> None:
+    def __init__(self, test: Test, profiler: Profiler = None, record: bool = False) -> None:
         self.name = 'lagrangian_heuristics'
         self.test = test
         self.z_max = -INF
         self.z_ub = INF
-        self.costs = test.covering_objects_costs.copy()
-        self.p = test.covering_objects_costs.copy()
-        self.t = [min([a * b for a, b in zip(test.covering_objects_costs, coverage_of_obj) if b != 0]) for
-                  coverage_of_obj in test.coverage_array]
-        self.x = [0] * test.count_covering_objects
+        self.costs = test.covering_objects_costs.astype(np.int64)
+        self.p = test.covering_objects_costs.astype(np.float64)
+        self.t = np.minimum.reduceat(test.covering_objects_costs[test.covering_columns.indices],
+                                     test.covering_columns.indptr[:-1]).astype(np.float64)
+        self.x = np.zeros(test.count_covering_objects, dtype=np.int8)
+        self.profiler = profiler or NULL_PROFILER
+        self.record = record
+        self.trajectory: Trajectory | None = None
+        self.repair = Repair(test, self.profiler)
+        self.core = test
+        self.core_columns: np.ndarray | None = None
+        self.full_costs = self.costs
+        self.full_p = self.p
 
     def start(self, count_iteration: int, time_limit: int = 300, visualization: bool = False,
-              consistency_of_result: int = 1000, optimum=None) -> tuple:
+              consistency_of_result: int = 1000, optimum=None, callback=None, core_size: int = None,
+              pricing_interval: int = 10) -> tuple:
+        callback = Callback.wrap(callback)
+        core = core_size is not None and core_size < self.test.count_covering_objects
         f = 2
         old_z_ub = -self.z_max
         count_result_repetitions = 0
-        masks = []
+        self.trajectory = Trajectory(self.test.count_covering_objects) if visualization or self.record else None
         start_time = time.time()
         times = []
         results = []
         set_covering_objects = set()
         best_solution = []
-        for _ in tqdm(range(count_iteration), colour='GREEN'):
-            z_lb, coefficients = self.calculate_z_lb()
-            self.z_max = max(self.z_max, z_lb)
+        pbar = progress(count_iteration)
+        for iteration in range(count_iteration):
+            pbar.update(1)
+            if core and iteration % pricing_interval == 0:
+                with self.profiler.phase('pricing'):
+                    self.z_max = max(self.z_max, self.price_core(core_size))
+            with self.profiler.phase('lower_bound'):
+                z_lb, coefficients = self.calculate_z_lb()
+            if not core:
+                self.z_max = max(self.z_max, z_lb)
             if old_z_ub == self.z_ub:
                 count_result_repetitions += 1
             else:
                 count_result_repetitions = 0
-            set_covering_objects = self.find_solution()
-            self.z_ub = min(self.z_ub, self.calculate_costs(set_covering_objects))
-            masks.append([(0, 1)[i in set_covering_objects] for i in range(self.test.count_covering_objects)])
+            with self.profiler.phase('upper_bound'):
+                set_covering_objects = self.find_solution()
+                self.z_ub = min(self.z_ub, self.calculate_costs(set_covering_objects))
+            self.profiler.count('evaluations')
+            if self.trajectory is not None:
+                self.trajectory.record(self.to_mask(set_covering_objects))
             times.append(time.time() - start_time)
             results.append(self.z_ub)
-            if math.ceil(self.z_max) == self.z_ub:
-                break
-            self.p = self.calculate_p(z_lb, coefficients)
-            if consistency_of_result == 30:
-                f /= 2
-            subgradient = self.calculate_subgradient()
-            if sum([g ** 2 for g in subgradient]) == 0:
-                break
-            step_size = self.calculate_step_size(f, z_lb, subgradient)
-            self.t = self.update_lagrange_multipliers(step_size, subgradient)
             if self.z_ub < old_z_ub:
                 old_z_ub = self.z_ub
-                best_solution = [(0, 1)[i in set_covering_objects] for i in range(self.test.count_covering_objects)]
+                best_solution = self.to_mask(set_covering_objects)
+            if callback(self.z_ub, lambda: self.to_mask(set_covering_objects), times[-1]):
+                break
+            if math.ceil(self.z_max) == self.z_ub:
+                break
+            with self.profiler.phase('multipliers'):
+                if not core:
+                    self.p = self.calculate_p(z_lb, coefficients)
+                if consistency_of_result == 30:
+                    f /= 2
+                subgradient = self.calculate_subgradient()
+                if not subgradient.any():
+                    break
+                step_size = self.calculate_step_size(f, z_lb, subgradient)
+                self.t = self.update_lagrange_multipliers(step_size, subgradient)
             if self.z_ub == optimum:
                 break
             if count_result_repetitions > consistency_of_result:
                 break
             if times[-1] > time_limit:
                 break
+        pbar.close()
 
         if visualization:
+            from services.visualization import Video, IMAGE_SIZE
             file_name = f'{self.name}_{count_iteration}'
             video = Video(IMAGE_SIZE, self.test)
-            video.create_video(masks, file_name)
+            video.create_video(self.trajectory, file_name, times)
         return results, times, best_solution
 
     def calculate_z_lb(self) -> tuple:
-        coefficients = [self.costs[j] - sum(
-            [self.test.coverage_array[i][j] * self.t[i] for i in range(self.test.count_objects_to_be_covered)]) for j in
-                        range(self.test.count_covering_objects)]
-        self.x = [(0, 1)[c <= 0] for c in coefficients]
-        return sum([a * b for a, b in zip(coefficients, self.x)]) + sum(self.t), coefficients
+        coefficients = self.costs - self.core.rows_to_be_covered.dot(self.t)
+        self.x = (coefficients <= 0).astype(np.int8)
+        return coefficients[self.x == 1].sum() + self.t.sum(), coefficients
 
     def find_solution(self) -> list:
-        s = [i for i in range(self.test.count_covering_objects) if self.x[i] == 1]
-        uncovered_objects = set()
-        columns_count_in_coverage = [0] * self.test.count_objects_to_be_covered
-
-        for i in range(self.test.count_objects_to_be_covered):
-            columns_count_in_coverage[i] = sum([x * y for x, y in zip(self.x, self.test.coverage_array[i])])
-            if columns_count_in_coverage[i] == 0:
-                uncovered_objects.add(i)
-
-        while len(uncovered_objects) != 0:
-            i = list(uncovered_objects)[0]
-            j = min(self.test.covering_columns[i], key=lambda x: self.costs[x])
-            s.append(j)
-            for v in self.test.rows_to_be_covered[j]:
-                columns_count_in_coverage[v] += 1
-            uncovered_objects = uncovered_objects.difference(self.test.rows_to_be_covered[j])
-
-        for j in sorted(s, key=lambda x: -self.costs[x]):
-            if len([i for i in self.test.rows_to_be_covered[j] if columns_count_in_coverage[i] < 2]) == 0:
-                s.remove(j)
-                for i in self.test.rows_to_be_covered[j]:
-                    columns_count_in_coverage[i] -= 1
-        return sorted(s)
+        return np.flatnonzero(self.repair.fix(self.x, self.costs)).tolist()
 
     def calculate_costs(self, s: list) -> int:
-        return sum([self.costs[i] for i in s])
+        return int(self.costs[s].sum())
+
+    def to_mask(self, s: list) -> list:
+        mask = np.zeros(self.test.count_covering_objects, dtype=np.int8)
+        mask[s if self.core_columns is None else self.core_columns[s]] = 1
+        return mask.tolist()
 
     def calculate_p(self, z_lb, coefficients):
-        p = [max(([self.p[k], z_lb], [self.p[k], z_lb + coefficients[k]])[self.x[k] == 0]) for k in
-             range(self.test.count_covering_objects)]
-        self.costs = [(self.costs[k], INF)[p[k] > self.z_ub] for k in range(self.test.count_covering_objects)]
+        p = np.maximum(self.p, np.where(self.x == 0, z_lb + coefficients, z_lb))
+        self.costs[p > self.z_ub] = INF
         return p
 
     def calculate_subgradient(self):
-        g = [1 - sum([a * b for a, b in zip(self.x, self.test.coverage_array[i])]) for i in
-             range(self.test.count_objects_to_be_covered)]
-        g = [(g[i], 0)[self.t[i] == 0 and g[i] < 0] for i in range(self.test.count_objects_to_be_covered)]
+        g = 1 - self.core.covering_columns.count(self.x)
+        g[(self.t == 0) & (g < 0)] = 0
         return g
 
+    def price_core(self, core_size: int) -> float:
+        if self.core_columns is not None:
+            self.full_costs[self.core_columns] = self.costs
+            self.full_p[self.core_columns] = self.p
+        coefficients = self.full_costs - self.test.rows_to_be_covered.dot(self.t)
+        x = coefficients <= 0
+        z_lb = coefficients[x].sum() + self.t.sum()
+        if self.z_ub != INF:
+            self.full_p = np.maximum(self.full_p, np.where(x, z_lb, z_lb + coefficients))
+            self.full_costs[self.full_p > self.z_ub] = INF
+            coefficients = self.full_costs - self.test.rows_to_be_covered.dot(self.t)
+
+        rows = self.test.covering_columns
+        order = np.lexsort((coefficients[rows.indices], rows.major))
+        cheapest = rows.indices[order[rows.indptr[:-1]]]
+        lowest = np.argpartition(coefficients, core_size)[:core_size]
+        self.core_columns = np.union1d(lowest, cheapest)
+        self.core = self.test.subproblem(np.arange(self.test.count_objects_to_be_covered), self.core_columns)
+        self.costs = self.full_costs[self.core_columns]
+        self.p = self.full_p[self.core_columns]
+        self.repair = Repair(self.core, self.profiler)
+        return z_lb
+
     def calculate_step_size(self, f, z_lb, subgradient):
-        return f * (1.05 * self.z_ub - z_lb) / sum([g ** 2 for g in subgradient])
+        return f * (1.05 * self.z_ub - z_lb) / int((subgradient ** 2).sum())
 
     def update_lagrange_multipliers(self, step_size, subgradient):
-        return [max(0, self.t[i] + step_size * subgradient[i]) for i in range(self.test.count_objects_to_be_covered)]
+        return np.maximum(0, self.t + step_size * subgradient)
@@ -0,0 +1,189 @@
+import time
+from random import random, randrange
+
+import numpy as np
+
+from algorithms.anytime import Callback
+from algorithms.repair import Repair
+from services.generation import Test
+from services.profiling import NULL_PROFILER, Profiler
+from services.progress import progress
+from services.trajectory import Trajectory
+
+
+class LocalSearch:
+    def __init__(self, test: Test, profiler: Profiler = None, record: bool = False) -> None:
+        self.name = 'local_search'
+        self.test = test
+        self.costs = test.covering_objects_costs.tolist()
+        self.rows_of = [rows.tolist() for rows in test.rows_to_be_covered]
+        self.row_sets = [frozenset(rows) for rows in self.rows_of]
+        self.columns_of = [columns.tolist() for columns in test.covering_columns]
+        self.profiler = profiler or NULL_PROFILER
+        self.record = record
+        self.trajectory: Trajectory | None = None
+        self.repair = Repair(test, self.profiler)
+        self.x = [0] * test.count_covering_objects
+        self.cover = [0] * test.count_objects_to_be_covered
+        self.owners = [0] * test.count_objects_to_be_covered
+        self.drop_loss = [0] * test.count_covering_objects
+        self.cost = 0
+        self.dirty = set()
+
+    def start(self, count_iteration: int = 1000, initial_solution=None, kick_size: int = 3,
+              consistency_of_result: int = 200, time_limit: int = 300, visualization: bool = False, optimum=None,
+              callback=None) -> tuple:
+        callback = Callback.wrap(callback)
+        start_time = time.time()
+        self.trajectory = Trajectory(self.test.count_covering_objects) if visualization or self.record else None
+        times = []
+        results = []
+        if initial_solution is None:
+            initial_solution = np.zeros(self.test.count_covering_objects, dtype=np.int8)
+        self.set_solution(initial_solution)
+        self.descend()
+        best_cost = self.cost
+        best_solution = list(self.x)
+        count_result_repetitions = 0
+        pbar = progress(count_iteration)
+        for _ in range(count_iteration):
+            pbar.update(1)
+            with self.profiler.phase('kick'):
+                self.kick(kick_size)
+            self.descend()
+            if self.cost < best_cost:
+                best_cost = self.cost
+                best_solution = list(self.x)
+                count_result_repetitions = 0
+            else:
+                count_result_repetitions += 1
+                if self.cost > best_cost and random() < 0.5:
+                    self.set_solution(best_solution)
+            if self.trajectory is not None:
+                self.trajectory.record(best_solution)
+            times.append(time.time() - start_time)
+            results.append(best_cost)
+            if callback(best_cost, best_solution, times[-1]):
+                break
+            if best_cost == optimum:
+                break
+            if count_result_repetitions > consistency_of_result:
+                break
+            if times[-1] > time_limit:
+                break
+        pbar.close()
+
+        if visualization:
+            from services.visualization import Video, IMAGE_SIZE
+            file_name = f'{self.name}_{count_iteration}_{kick_size}'
+            video = Video(IMAGE_SIZE, self.test)
+            video.create_video(self.trajectory, file_name, times)
+        return results, times, best_solution
+
+    def improve(self, solution) -> list:
+        self.set_solution(solution)
+        self.descend()
+        return list(self.x)
+
+    def set_solution(self, solution) -> None:
+        x = self.repair.fix(solution)
+        cover = self.test.covering_columns.count(x)
+        owners = np.bincount(self.test.covering_columns.major, minlength=self.test.count_objects_to_be_covered,
+                             weights=x[self.test.covering_columns.indices] * self.test.covering_columns.indices)
+        unique = self.test.rows_to_be_covered.count(cover == 1)
+        self.x = x.tolist()
+        self.cover = cover.tolist()
+        self.owners = owners.astype(np.int64).tolist()
+        self.drop_loss = np.where(x == 1, unique, 0).tolist()
+        self.cost = int(self.test.covering_objects_costs @ x)
+        self.dirty = set(range(self.test.count_covering_objects))
+
+    def descend(self) -> None:
+        with self.profiler.phase('descend'):
+            while self.dirty:
+                j = self.dirty.pop()
+                if self.x[j] == 1:
+                    if self.drop_loss[j] == 0:
+                        self.flip(j)
+                        self.profiler.count('drop_moves')
+                    else:
+                        self.__replace_by_two(j)
+                else:
+                    self.__add_and_drop(j)
+
+    def kick(self, kick_size: int) -> None:
+        for _ in range(randrange(1, kick_size + 1)):
+            j = randrange(self.test.count_covering_objects)
+            if self.x[j] == 0:
+                self.flip(j)
+
+    def flip(self, j: int) -> None:
+        cover, owners, drop_loss, dirty = self.cover, self.owners, self.drop_loss, self.dirty
+        if self.x[j] == 0:
+            self.x[j] = 1
+            self.cost += self.costs[j]
+            dirty.add(j)
+            for i in self.rows_of[j]:
+                cover[i] += 1
+                owners[i] += j
+                if cover[i] == 1:
+                    drop_loss[j] += 1
+                elif cover[i] == 2:
+                    drop_loss[owners[i] - j] -= 1
+                    dirty.update(self.columns_of[i])
+        else:
+            self.x[j] = 0
+            self.cost -= self.costs[j]
+            for i in self.rows_of[j]:
+                cover[i] -= 1
+                owners[i] -= j
+                if cover[i] == 0:
+                    drop_loss[j] -= 1
+                elif cover[i] == 1:
+                    drop_loss[owners[i]] += 1
+                    dirty.update(self.columns_of[i])
+        self.profiler.count('flips')
+
+    def __add_and_drop(self, k: int) -> None:
+        hits = {}
+        for i in self.rows_of[k]:
+            if self.cover[i] == 1:
+                owner = self.owners[i]
+                hits[owner] = hits.get(owner, 0) + 1
+        droppable = [j for j, count in hits.items() if count == self.drop_loss[j]]
+        if sum(self.costs[j] for j in droppable) <= self.costs[k]:
+            return
+        cost = self.cost
+        dirty, self.dirty = self.dirty, set()
+        self.flip(k)
+        dropped = []
+        for j in sorted(droppable, key=lambda j: -self.costs[j]):
+            if self.drop_loss[j] == 0:
+                self.flip(j)
+                dropped.append(j)
+        if self.cost < cost:
+            self.profiler.count('swap_moves' if len(dropped) == 1 else 'add_drop_moves')
+            self.dirty = dirty | self.dirty
+            return
+        for j in reversed(dropped):
+            self.flip(j)
+        self.flip(k)
+        self.dirty = dirty
+
+    def __replace_by_two(self, j: int) -> None:
+        uncovered = [i for i in self.rows_of[j] if self.cover[i] == 1]
+        for k1 in self.columns_of[uncovered[0]]:
+            if self.x[k1] == 1 or self.costs[k1] >= self.costs[j]:
+                continue
+            rest = [i for i in uncovered if i not in self.row_sets[k1]]
+            if len(rest) == 0:
+                continue
+            for k2 in self.columns_of[rest[0]]:
+                if self.x[k2] == 1 or self.costs[k1] + self.costs[k2] >= self.costs[j]:
+                    continue
+                if all(i in self.row_sets[k2] for i in rest):
+                    self.flip(k1)
+                    self.flip(k2)
+                    self.flip(j)
+                    self.profiler.count('replace_moves')
+                    return
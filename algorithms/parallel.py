@@ -0,0 +1,62 @@
+import inspect
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from services.generation import Test
+from services.shared import shared
+
+worker_test: Test | None = None
+
+
+def init_worker(test: Test) -> None:
+    global worker_test
+    worker_test = test
+
+
+def run_algorithm(algorithm, params: list, seed: int, deadline: float | None, run_time_limit: float | None,
+                  optimum) -> tuple | None:
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+    kwargs = {'optimum': optimum}
+    time_limit = run_time_limit
+    if deadline is not None:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return None
+        time_limit = remaining if time_limit is None else min(time_limit, remaining)
+    if time_limit is not None and 'time_limit' in inspect.signature(algorithm.start).parameters:
+        kwargs['time_limit'] = time_limit
+    result = algorithm(worker_test).start(*params, **kwargs)
+    return result[0], result[1], result[-1]
+
+
+class ParallelRunner:
+    def __init__(self, test: Test, algorithm, count_workers: int = None) -> None:
+        self.test = test
+        self.algorithm = algorithm
+        self.count_workers = count_workers or os.cpu_count()
+
+    def start(self, params: list | tuple, count_runs: int = 5, time_limit: float = None, seed: int = 0,
+              optimum=None, run_time_limit: float = None) -> list:
+        deadline = None if time_limit is None else time.time() + time_limit
+        with shared(self.test) as test, ProcessPoolExecutor(min(self.count_workers, count_runs),
+                                                            initializer=init_worker, initargs=(test,)) as executor:
+            futures = [executor.submit(run_algorithm, self.algorithm, list(params), seed + i, deadline,
+                                       run_time_limit, optimum)
+                       for i in range(count_runs)]
+            runs = [future.result() for future in futures]
+        return [run for run in runs if run is not None]
+
+    @staticmethod
+    def best(runs: list) -> tuple:
+        return min(runs, key=lambda run: min(ParallelRunner.__flatten(run[0])))
+
+    @staticmethod
+    def __flatten(results: list) -> list:
+        if len(results) != 0 and isinstance(results[0], list):
+            return [value for part in results for value in part]
+        return results
@@ -0,0 +1,126 @@
+import random
+import time
+from math import exp
+from multiprocessing import Pipe, Process
+
+import numpy as np
+
+from algorithms.anytime import Callback
+from algorithms.simulated_annealing import SimulatedAnnealing
+from services.generation import Test
+from services.profiling import NULL_PROFILER, Profiler
+from services.progress import progress
+from services.shared import shared
+from services.trajectory import Trajectory
+
+INF = 100000000000
+
+
+def run_replica(connection, test: Test, initial_condition, seed: int) -> None:
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+    simulated_ann = SimulatedAnnealing(test)
+    simulated_ann.prepare(initial_condition)
+    best_energy = simulated_ann.energy
+    best_condition = simulated_ann.condition.tolist()
+    improved = True
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        temperature, count_steps = message
+        for _ in range(count_steps):
+            energy = simulated_ann.step(temperature)
+            if energy < best_energy:
+                best_energy = energy
+                best_condition = simulated_ann.condition.tolist()
+                improved = True
+        connection.send((simulated_ann.energy, best_energy, best_condition if improved else None))
+        improved = False
+    connection.close()
+
+
+class ParallelTempering:
+    def __init__(self, test: Test, profiler: Profiler = None, record: bool = False) -> None:
+        self.name = 'parallel_tempering'
+        self.test = test
+        self.profiler = profiler or NULL_PROFILER
+        self.record = record
+        self.trajectory: Trajectory | None = None
+        self.temperatures: list[float] = []
+
+    def start(self, count_replicas: int = 4, min_temperature: float = 1, max_temperature: float = 50,
+              count_iteration: int = 10000, exchange_interval: int = 100, initial_condition=None,
+              consistency_of_result: int = 20, time_limit: int = 300, visualization: bool = False, seed: int = 0,
+              optimum=None, callback=None) -> tuple:
+        callback = Callback.wrap(callback)
+        ratio = (max_temperature / min_temperature) ** (1 / max(count_replicas - 1, 1))
+        self.temperatures = [min_temperature * ratio ** k for k in range(count_replicas)]
+        with shared(self.test) as test:
+            connections = []
+            processes = []
+            for i in range(count_replicas):
+                connection, child_connection = Pipe()
+                process = Process(target=run_replica, args=(child_connection, test, initial_condition, seed + i),
+                                  daemon=True)
+                process.start()
+                connections.append(connection)
+                processes.append(process)
+
+            self.trajectory = Trajectory(self.test.count_covering_objects) if visualization or self.record else None
+            times = []
+            results = []
+            start_time = time.time()
+            order = list(range(count_replicas))
+            best_energy = INF
+            best_condition = []
+            count = 0
+            count_result_repetitions = 0
+            pbar = progress(count_iteration)
+            while count < count_iteration and count_result_repetitions < consistency_of_result:
+                count_steps = min(exchange_interval, count_iteration - count)
+                for k, i in enumerate(order):
+                    connections[i].send((self.temperatures[k], count_steps))
+                replies = [connection.recv() for connection in connections]
+                pbar.update(count_steps)
+                count += count_steps
+
+                count_result_repetitions += 1
+                for _, energy, condition in replies:
+                    if condition is not None and energy < best_energy:
+                        best_energy = energy
+                        best_condition = condition
+                        count_result_repetitions = 0
+                with self.profiler.phase('exchange'):
+                    self.__exchange(order, [reply[0] for reply in replies], count // exchange_interval % 2)
+                if self.trajectory is not None:
+                    self.trajectory.record(best_condition)
+                times.append(time.time() - start_time)
+                results.append(best_energy)
+                if callback(best_energy, best_condition, times[-1]):
+                    break
+                if best_energy == optimum:
+                    break
+                if times[-1] > time_limit:
+                    break
+
+            for connection, process in zip(connections, processes):
+                connection.send(None)
+                process.join()
+        if visualization:
+            from services.visualization import Video, IMAGE_SIZE
+            file_name = (f'{self.name}_{count_replicas}_{min_temperature}_{max_temperature}_'
+                         f'{count_iteration}_{exchange_interval}')
+            video = Video(IMAGE_SIZE, self.test)
+            video.create_video(self.trajectory, file_name, times)
+        pbar.close()
+        return results, times, best_condition
+
+    def __exchange(self, order: list, energies: list, parity: int) -> None:
+        for k in range(parity, len(order) - 1, 2):
+            cold, hot = order[k], order[k + 1]
+            exponent = (1 / self.temperatures[k] - 1 / self.temperatures[k + 1]) * (energies[cold] - energies[hot])
+            self.profiler.count('exchanges')
+            if exponent >= 0 or exp(exponent) > random.random():
+                order[k], order[k + 1] = hot, cold
+                self.profiler.count('accepted_exchanges')
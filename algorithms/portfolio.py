@@ -0,0 +1,147 @@
+import inspect
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+
+import numpy as np
+
+from algorithms.anytime import Callback
+from algorithms.black_hole import BlackHole
+from algorithms.lagrangian_heuristics import LagrangianHeuristics
+from algorithms.local_search import LocalSearch
+from algorithms.simulated_annealing import SimulatedAnnealing
+from services.generation import Test
+from services.profiling import NULL_PROFILER, Profiler
+from services.shared import shared
+
+INF = 100000000000
+SEED_PARAMETERS = ('initial_solution', 'initial_condition', 'initial_black_hole')
+SOLVERS = {'LH': (LagrangianHeuristics, [5000]),
+           'SA': (SimulatedAnnealing, [500, 10000]),
+           'BH': (BlackHole, [500, 20, True]),
+           'LS': (LocalSearch, [10000])}
+
+worker_test: Test | None = None
+worker_incumbent: 'SharedIncumbent | None' = None
+worker_stop = None
+
+
+class SharedIncumbent:
+    def __init__(self, count_columns: int, context=None) -> None:
+        context = context or get_context()
+        self.cost = context.Value('q', INF)
+        self.solution = context.Array('b', count_columns, lock=False)
+
+    def offer(self, cost: int, solution) -> bool:
+        with self.cost.get_lock():
+            if cost >= self.cost.value:
+                return False
+            self.solution[:] = [int(x) for x in solution]
+            self.cost.value = int(cost)
+        return True
+
+    def get(self) -> tuple:
+        with self.cost.get_lock():
+            return self.cost.value, list(self.solution)
+
+
+def init_worker(test: Test, incumbent: SharedIncumbent, stop) -> None:
+    global worker_test, worker_incumbent, worker_stop
+    worker_test = test
+    worker_incumbent = incumbent
+    worker_stop = stop
+
+
+def publish(incumbent) -> None:
+    worker_incumbent.offer(incumbent.cost, incumbent.solution)
+
+
+def run_slice(algorithm, params: list, seed: int, slice_time: float, optimum) -> tuple:
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+    start_cost, solution = worker_incumbent.get()
+    parameters = list(inspect.signature(algorithm.start).parameters)[1:]
+    kwargs = {'optimum': optimum, 'callback': Callback(publish, worker_stop)}
+    if 'time_limit' in parameters:
+        kwargs['time_limit'] = slice_time
+    if start_cost < INF:
+        for name in SEED_PARAMETERS:
+            if name in parameters and parameters.index(name) >= len(params):
+                kwargs[name] = solution
+                break
+    start_time = time.time()
+    result = algorithm(worker_test).start(*params, **kwargs)
+    cost = int(worker_test.covering_objects_costs @ np.asarray(result[-1], dtype=np.int64))
+    worker_incumbent.offer(cost, result[-1])
+    if cost == optimum:
+        worker_stop.set()
+    return start_cost, cost, time.time() - start_time
+
+
+class Portfolio:
+    def __init__(self, test: Test, profiler: Profiler = None) -> None:
+        self.name = 'portfolio'
+        self.test = test
+        self.profiler = profiler or NULL_PROFILER
+        self.scores: dict[str, float] = {}
+        self.shares: dict[str, float] = {}
+
+    def start(self, solvers: dict = None, count_workers: int = None, slice_time: float = 5, decay: float = 0.5,
+              exploration: float = 0.1, time_limit: float = 300, seed: int = 0, optimum=None,
+              callback=None) -> tuple:
+        callback = Callback.wrap(callback)
+        solvers = solvers or SOLVERS
+        count_workers = count_workers or os.cpu_count()
+        context = get_context()
+        incumbent = SharedIncumbent(self.test.count_covering_objects, context)
+        stop = context.Event()
+        self.scores = {name: 1.0 for name in solvers}
+        self.shares = {name: 0.0 for name in solvers}
+        times = []
+        results = []
+        start_time = time.time()
+        deadline = start_time + time_limit
+        with shared(self.test) as test, ProcessPoolExecutor(count_workers, mp_context=context,
+                                                            initializer=init_worker,
+                                                            initargs=(test, incumbent, stop)) as executor:
+            running = {}
+            while True:
+                remaining = deadline - time.time()
+                while len(running) < count_workers and remaining > 0 and not stop.is_set():
+                    name = self.__choose(exploration)
+                    algorithm, params = solvers[name]
+                    future = executor.submit(run_slice, algorithm, list(params), seed, min(slice_time, remaining),
+                                             optimum)
+                    running[future] = name
+                    seed += 1
+                if len(running) == 0:
+                    break
+                done, _ = wait(running, timeout=max(remaining, 0) + slice_time, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    start_cost, cost, duration = future.result()
+                    self.__reward(name, start_cost, cost, duration, decay)
+                cost, solution = incumbent.get()
+                times.append(time.time() - start_time)
+                results.append(cost)
+                if callback(cost, solution, times[-1]):
+                    stop.set()
+                if cost == optimum or time.time() > deadline:
+                    stop.set()
+        return results, times, incumbent.get()[1]
+
+    def __choose(self, exploration: float) -> str:
+        names = list(self.scores)
+        total = sum(self.scores.values())
+        weights = [(1 - exploration) * self.scores[name] / total + exploration / len(names) for name in names]
+        return random.choices(names, weights)[0]
+
+    def __reward(self, name: str, start_cost: int, cost: int, duration: float, decay: float) -> None:
+        improvement = 1.0 if start_cost >= INF else max(start_cost - cost, 0) / start_cost
+        self.scores[name] = decay * self.scores[name] + (1 - decay) * improvement / max(duration, 1e-3)
+        if sum(self.scores.values()) == 0:
+            self.scores = {key: 1.0 for key in self.scores}
+        self.shares[name] += duration
+        self.profiler.count(f'slices_{name}')
@@ -0,0 +1,102 @@
+from heapq import heapify, heappop, heappush
+
+import numpy as np
+
+from services.generation import Test
+from services.profiling import NULL_PROFILER, Profiler
+
+
+class Repair:
+    def __init__(self, test: Test, profiler: Profiler = None) -> None:
+        self.test = test
+        self.profiler = profiler or NULL_PROFILER
+        self.costs = np.asarray(test.covering_objects_costs, dtype=np.float64)
+
+    def fix(self, solution, costs=None, counts: np.ndarray = None) -> np.ndarray:
+        with self.profiler.phase('repair'):
+            solution = np.array(solution, dtype=np.int8)
+            costs = self.costs if costs is None else np.asarray(costs, dtype=np.float64)
+            if counts is None:
+                counts = self.test.covering_columns.count(solution)
+            self.add_columns(solution, costs, counts)
+            self.drop_columns(solution, costs, counts)
+        self.profiler.count('repairs')
+        return solution
+
+    def move(self, solution: np.ndarray, counts: np.ndarray, columns: list, costs=None) -> list:
+        with self.profiler.phase('repair'):
+            costs = self.costs if costs is None else np.asarray(costs, dtype=np.float64)
+            for j in columns:
+                self.toggle(solution, counts, j)
+            rows = self.__rows_of(columns)
+            added = self.add_columns(solution, costs, counts, rows)
+            turned_on = [j for j in columns if solution[j] == 1]
+            covered_again = self.__rows_of(turned_on + added)
+            candidates = np.unique(self.__columns_of(np.unique(covered_again))) if len(covered_again) != 0 else []
+            candidates = np.union1d(candidates, turned_on).astype(np.int64)
+            dropped = self.drop_columns(solution, costs, counts, candidates)
+        self.profiler.count('repairs')
+        return list(columns) + added + dropped
+
+    def undo(self, solution: np.ndarray, counts: np.ndarray, changed: list) -> None:
+        for j in reversed(changed):
+            self.toggle(solution, counts, j)
+
+    def toggle(self, solution: np.ndarray, counts: np.ndarray, j: int) -> None:
+        solution[j] = 1 - solution[j]
+        counts[self.test.rows_to_be_covered[j]] += 1 if solution[j] == 1 else -1
+
+    def add_columns(self, solution: np.ndarray, costs: np.ndarray, counts: np.ndarray, rows=None) -> list:
+        if rows is None:
+            uncovered = counts == 0
+            count_uncovered = int(uncovered.sum())
+            if count_uncovered == 0:
+                return []
+            newly_covered = self.test.rows_to_be_covered.count(uncovered)
+            candidates = np.flatnonzero(newly_covered)
+            newly_covered = newly_covered[candidates]
+        else:
+            rows = np.unique(rows[counts[rows] == 0])
+            count_uncovered = len(rows)
+            if count_uncovered == 0:
+                return []
+            candidates, newly_covered = np.unique(self.__columns_of(rows), return_counts=True)
+        queue = list(zip((costs[candidates] / newly_covered).tolist(), candidates.tolist()))
+        heapify(queue)
+        added = []
+        while count_uncovered != 0:
+            ratio, j = heappop(queue)
+            rows = self.test.rows_to_be_covered[j]
+            count = int((counts[rows] == 0).sum())
+            if count == 0:
+                continue
+            if costs[j] / count > ratio:
+                heappush(queue, (costs[j] / count, j))
+                continue
+            solution[j] = 1
+            counts[rows] += 1
+            count_uncovered -= count
+            added.append(j)
+        self.profiler.count('columns_added', len(added))
+        return added
+
+    def drop_columns(self, solution: np.ndarray, costs: np.ndarray, counts: np.ndarray, candidates=None) -> list:
+        selected = np.flatnonzero(solution) if candidates is None else np.asarray(candidates, dtype=np.int64)
+        selected = selected[solution[selected] == 1]
+        dropped = []
+        for j in selected[np.argsort(-costs[selected], kind='stable')].tolist():
+            rows = self.test.rows_to_be_covered[j]
+            if (counts[rows] >= 2).all():
+                solution[j] = 0
+                counts[rows] -= 1
+                dropped.append(j)
+        self.profiler.count('columns_dropped', len(dropped))
+        return dropped
+
+    def __rows_of(self, columns: list) -> np.ndarray:
+        if len(columns) == 0:
+            return np.zeros(0, dtype=np.int32)
+        return np.concatenate([self.test.rows_to_be_covered[j] for j in columns])
+
+    def __columns_of(self, rows) -> np.ndarray:
+        return np.concatenate([self.test.covering_columns[i] for i in rows])
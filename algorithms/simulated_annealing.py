@@ -1,26 +1,42 @@
 import time
+from itertools import accumulate
 from math import exp, log
-from random import randint, choice, random
+from random import randint, choices, random
 
-from tqdm import tqdm
+import numpy as np
 
+from algorithms.anytime import Callback
+from algorithms.repair import Repair
 from services.generation import Test
-from services.visualization import Video, IMAGE_SIZE
+from services.profiling import NULL_PROFILER, Profiler
+from services.progress import progress
+from services.trajectory import Trajectory
 
 INF = 100000000000
 
 
 class SimulatedAnnealing:
-    def __init__(self, test: Test):
+    def __init__(self, test: Test, profiler: Profiler = None, record: bool = False):
         self.name = 'simulated_annealing'
-        self.condition = []
+        self.condition = np.zeros(test.count_covering_objects, dtype=np.int8)
+        self.counts = np.zeros(test.count_objects_to_be_covered, dtype=np.int64)
+        self.energy = 0
         self.temperature = 0
         self.test = test
+        self.profiler = profiler or NULL_PROFILER
+        self.record = record
+        self.trajectory: Trajectory | None = None
+        self.repair = Repair(test, self.profiler)
+        self.columns = range(test.count_covering_objects)
+        self.cumulative_weights = list(accumulate(self.__value_of_object(j) for j in self.columns))
+        self.max_flips = max(1, min(int(test.count_covering_objects * 0.05), 2))
 
     def start(self, initial_temperature: int, count_iteration: int = 10000, initial_condition=None,
-              consistency_of_result: int = 1000, time_limit=300, visualization: bool = False, optimum=None):
+              consistency_of_result: int = 1000, time_limit=300, visualization: bool = False, optimum=None,
+              callback=None):
+        callback = Callback.wrap(callback)
         count_result_repetitions = 0
-        masks = []
+        self.trajectory = Trajectory(self.test.count_covering_objects) if visualization or self.record else None
         count = 0
         results = []
         times = []
@@ -31,28 +47,36 @@ class SimulatedAnnealing:
         else:
             times = [0]
             results = [self.__value_of_energy(initial_condition)]
-            self.condition = initial_condition
-        pbar = tqdm(total=count_iteration, colour='GREEN')
+            self.__set_condition(self.fix_condition(initial_condition))
+        pbar = progress(count_iteration)
         old_result = INF
         best_condition = []
         while count < count_iteration and count_result_repetitions < consistency_of_result:
             pbar.update(1)
-            new_condition = self.__change_condition()
-            delta = self.__value_of_energy(new_condition) - self.__value_of_energy(self.condition)
-            if delta > 0 or self.__probability_of_acceptance(delta):
-                self.condition = new_condition
-            result = self.__value_of_energy(self.condition)
+            with self.profiler.phase('move'):
+                changed, delta = self.__change_condition()
+            self.profiler.count('moves')
+            with self.profiler.phase('acceptance'):
+                if delta > 0 or self.__probability_of_acceptance(delta):
+                    self.energy += delta
+                    self.profiler.count('accepted_moves')
+                else:
+                    self.repair.undo(self.condition, self.counts, changed)
+            result = self.energy
             if old_result < result:
                 count_result_repetitions += 1
             else:
                 old_result = result
-                best_condition = self.condition.copy()
+                best_condition = self.condition.tolist()
                 count_result_repetitions = 0
-            masks.append(self.condition)
-            results.append(self.__value_of_energy(self.condition))
+            if self.trajectory is not None:
+                self.trajectory.record(self.condition)
+            results.append(result)
             times.append(time.time() - start_time)
             count += 1
             self.temperature = initial_temperature * self.__change_temperature(count + 1)
+            if callback(result, self.condition, times[-1]):
+                break
             if result == optimum:
                 break
             if count_result_repetitions > consistency_of_result:
@@ -61,70 +85,54 @@ class SimulatedAnnealing:
                 break
 
         if visualization:
+            from services.visualization import Video, IMAGE_SIZE
             file_name = (f'{self.name}_{initial_temperature}_'
                          f'{count_iteration}_{consistency_of_result}')
             video = Video(IMAGE_SIZE, self.test)
-            video.create_video(masks, file_name)
+            video.create_video(self.trajectory, file_name, times)
         pbar.close()
         return results, times, best_condition
 
+    def prepare(self, initial_condition=None) -> None:
+        if initial_condition is None:
+            self.__create_condition()
+        else:
+            self.__set_condition(self.fix_condition(initial_condition))
+
+    def step(self, temperature: float) -> int:
+        with self.profiler.phase('move'):
+            changed, delta = self.__change_condition()
+        self.profiler.count('moves')
+        with self.profiler.phase('acceptance'):
+            if delta <= 0 or (temperature > 0 and exp(-delta / temperature) > random()):
+                self.energy += delta
+                self.profiler.count('accepted_moves')
+            else:
+                self.repair.undo(self.condition, self.counts, changed)
+        return self.energy
+
     def __create_condition(self) -> None:
         condition = [randint(0, 1) for _ in range(self.test.count_covering_objects)]
-        self.condition = self.fix_condition(condition)
+        self.__set_condition(self.fix_condition(condition))
+
+    def __set_condition(self, condition: list) -> None:
+        self.condition = np.array(condition, dtype=np.int8)
+        self.counts = self.test.covering_columns.count(self.condition)
+        self.energy = self.__value_of_energy(condition)
 
     def fix_condition(self, condition: list):
-        uncovered_objects = set()
-        columns_count_in_coverage = [0] * self.test.count_objects_to_be_covered
-
-        for i in range(self.test.count_objects_to_be_covered):
-            columns_count_in_coverage[i] = sum([x * y for x, y in zip(condition, self.test.coverage_array[i])])
-            if columns_count_in_coverage[i] == 0:
-                uncovered_objects.add(i)
-
-        while len(uncovered_objects) != 0:
-            i = list(uncovered_objects)[0]
-            j = sorted(self.test.covering_columns[i],
-                       key=lambda k: self.calculate_significance(k, uncovered_objects,
-                                                                 self.test.rows_to_be_covered[k]))[0]
-            condition[j] = 1
-            for v in self.test.rows_to_be_covered[j]:
-                columns_count_in_coverage[v] += 1
-            uncovered_objects = uncovered_objects.difference(self.test.rows_to_be_covered[j])
-        for j in sorted([k for k in range(self.test.count_covering_objects) if condition[k] == 1],
-                        key=lambda x: -self.test.covering_objects_costs[x]):
-            if len([i for i in self.test.rows_to_be_covered[j] if columns_count_in_coverage[i] < 2]) == 0:
-                condition[j] = 0
-                for i in self.test.rows_to_be_covered[j]:
-                    columns_count_in_coverage[i] -= 1
-        return condition
-
-    def calculate_significance(self, k, uncovered_objects, j):
-        return self.test.covering_objects_costs[k] / len(uncovered_objects.intersection(j))
-
-    def __change_condition(self) -> list:
-        new_condition = self.condition.copy()
-        weights = []
-        all_weight = 0
-        for j in range(self.test.count_covering_objects):
-            weight = self.__value_of_object(j)
-            all_weight += weight
-            weights.append(weight)
-
-        proportion = [0]
-        for weight in weights:
-            proportion.append(proportion[-1] + weight / all_weight)
-        proportion[-1] = 1
-
-        for _ in range(randint(1, min(self.test.count_covering_objects * 0.05, 2))):
-            probability = random()
-            for i in range(1, self.test.count_covering_objects + 1):
-                if probability < proportion[i]:
-                    new_condition[i - 1] = 1 - new_condition[i - 1]
-                    break
-        return self.fix_condition(new_condition)
+        return self.repair.fix(condition).tolist()
+
+    def __change_condition(self) -> tuple:
+        columns = choices(self.columns, cum_weights=self.cumulative_weights, k=randint(1, self.max_flips))
+        changed = self.repair.move(self.condition, self.counts, columns)
+        flipped, flips = np.unique(changed, return_counts=True)
+        flipped = flipped[flips % 2 == 1]
+        delta = int(self.test.covering_objects_costs[flipped] @ (2 * self.condition[flipped].astype(np.int64) - 1))
+        return changed, delta
 
     def __value_of_energy(self, condition: list) -> int:
-        return sum([a * b for a, b in zip(condition, self.test.covering_objects_costs)])
+        return int(np.dot(condition, self.test.covering_objects_costs))
 
     def __change_temperature(self, iteration: int) -> float:
         if self.temperature != 0:
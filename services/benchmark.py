@@ -0,0 +1,233 @@
+import argparse
+import inspect
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from algorithms.black_hole import BlackHole
+from algorithms.branch_and_bound import BranchAndBound
+from algorithms.genetic_algorithm import GeneticAlgorithm
+from algorithms.hybrid_approach import BH_LS, BH_SA, GA_LS, GA_SA, LH_BH, LH_LS, LH_SA, SA_GA
+from algorithms.island_genetic_algorithm import IslandGeneticAlgorithm
+from algorithms.lagrangian_heuristics import LagrangianHeuristics
+from algorithms.local_search import LocalSearch
+from algorithms.parallel_tempering import ParallelTempering
+from algorithms.portfolio import Portfolio
+from algorithms.simulated_annealing import SimulatedAnnealing
+from services.generation import Test
+from services.profiling import Profiler
+from services.reduction import Reduction
+
+INSTANCES = {'4': 429, '5': 253, '6': 138, 'A': 253, 'B': 69, 'C': 227, 'D': 60, 'E': 29, 'F': 14, 'G': 179,
+             'H': 64, 'test1': 899, 'test2': 371, 'test3': 1435, 'test4': 664}
+
+ALGORITHMS = {'BB': (BranchAndBound, [100, 1000]),
+              'BH': (BlackHole, [500, 20, False]),
+              'BH_AD': (BlackHole, [500, 20, True]),
+              'GA': (GeneticAlgorithm, [20, 0, (50, 50, 0), (100, 0, 0, 0), (0, 0), 500]),
+              'IGA': (IslandGeneticAlgorithm, [4, 20, 0, (50, 50, 0), (100, 0, 0, 0), (0, 0), 500]),
+              'LH': (LagrangianHeuristics, [5000]),
+              'LS': (LocalSearch, [10000]),
+              'PF': (Portfolio, []),
+              'PT': (ParallelTempering, [4, 1, 50, 20000]),
+              'SA': (SimulatedAnnealing, [500, 10000]),
+              'GA_SA': (GA_SA, [20, 0, (50, 50, 0), (100, 0, 0, 0), (0, 0), 250, 500, 5000]),
+              'LH_SA': (LH_SA, [2500, 500, 10000]),
+              'BH_SA': (BH_SA, [500, 20, 500, 5000]),
+              'LH_BH': (LH_BH, [5000, 500, 20]),
+              'SA_GA': (SA_GA, [500, 5000, 20, 0, (50, 50, 0), (100, 0, 0, 0), (0, 0), 250]),
+              'GA_LS': (GA_LS, [20, 0, (50, 50, 0), (100, 0, 0, 0), (0, 0), 250, 5000]),
+              'BH_LS': (BH_LS, [500, 20, 5000]),
+              'LH_LS': (LH_LS, [2500, 5000])}
+
+METRICS = ('time_to_target', 'time_to_optimum', 'total_time', 'gap', 'iterations_per_second', 'peak_rss_mb')
+LOWER_IS_BETTER = {'time_to_target': True, 'time_to_optimum': True, 'total_time': True, 'gap': True,
+                   'iterations_per_second': False, 'peak_rss_mb': True}
+
+
+def load_test(name: str) -> Test:
+    test = Test()
+    if name.startswith('test'):
+        test.load_generated_data(f'tests/{name}.txt')
+    else:
+        test.load_or_library_data(f'tests/{name}.txt')
+    return test
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 1)
+
+
+def flatten(results: list) -> list:
+    if len(results) != 0 and isinstance(results[0], list):
+        return [value for part in results for value in part]
+    return results
+
+
+def first_time(results: list, times: list, target: float | None) -> float | None:
+    if target is None:
+        return None
+    for i, result in enumerate(results):
+        if result <= target:
+            return round(times[min(i, len(times) - 1)], 4)
+    return None
+
+
+def run_benchmark(instance: str, algorithm: str, seed: int, time_limit: float | None, target_gap: float,
+                  profile: bool = False, reduce: bool = False) -> dict:
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+    test = load_test(instance)
+    optimum = INSTANCES.get(instance)
+    cls, params = ALGORITHMS[algorithm]
+    parameters = inspect.signature(cls.start).parameters
+    kwargs = {}
+    if time_limit is not None and 'time_limit' in parameters:
+        kwargs['time_limit'] = time_limit
+    if 'seed' in parameters:
+        kwargs['seed'] = seed
+    profiler = Profiler() if profile and 'profiler' in inspect.signature(cls).parameters else None
+    solver = cls if profiler is None else partial(cls, profiler=profiler)
+    start_time = time.perf_counter()
+    if reduce:
+        result = Reduction(test).start(solver, *params, optimum=optimum, **kwargs)
+    else:
+        result = solver(test).start(*params, optimum=optimum, **kwargs)
+    total_time = time.perf_counter() - start_time
+    results = [int(value) for value in flatten(result[0])]
+    times = list(result[1]) or [total_time]
+    cost = min(results)
+    target = None if optimum is None else optimum * (1 + target_gap)
+    record = {'instance': instance, 'algorithm': algorithm, 'seed': seed, 'cost': cost, 'optimum': optimum,
+              'gap': None if optimum is None else round((cost - optimum) / optimum, 6),
+              'time_to_target': first_time(results, times, target),
+              'time_to_optimum': first_time(results, times, optimum),
+              'total_time': round(total_time, 4), 'iterations': len(results),
+              'iterations_per_second': round(len(results) / total_time, 2) if total_time > 0 else None,
+              'peak_rss_mb': peak_rss_mb()}
+    if profiler is not None:
+        record['profile'] = profiler.to_dict()
+    return record
+
+
+def summarize(runs: list) -> dict:
+    groups = {}
+    for run in runs:
+        groups.setdefault(f'{run["instance"]}/{run["algorithm"]}', []).append(run)
+    summary = {}
+    for key, group in groups.items():
+        summary[key] = {'runs': len(group), 'best_cost': min(run['cost'] for run in group),
+                        'reached_target': sum(run['time_to_target'] is not None for run in group),
+                        'reached_optimum': sum(run['time_to_optimum'] is not None for run in group)}
+        for metric in METRICS:
+            values = [run[metric] for run in group if run[metric] is not None]
+            summary[key][metric] = round(statistics.median(values), 6) if values else None
+    return summary
+
+
+def run(instances: list, algorithms: list, count_runs: int = 3, seed: int = 0, time_limit: float = None,
+        target_gap: float = 0.01, count_workers: int = 1, profile: bool = False, reduce: bool = False) -> dict:
+    tasks = [(instance, algorithm, seed + i) for instance in instances for algorithm in algorithms
+             for i in range(count_runs)]
+    # every run gets a fresh interpreter so peak RSS is measured per run
+    with ProcessPoolExecutor(count_workers, mp_context=get_context('spawn'), max_tasks_per_child=1) as executor:
+        futures = [executor.submit(run_benchmark, instance, algorithm, run_seed, time_limit, target_gap, profile,
+                                   reduce)
+                   for instance, algorithm, run_seed in tasks]
+        runs = [future.result() for future in futures]
+    return {'meta': {'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(),
+                     'numpy': np.__version__, 'platform': platform.platform(), 'processor': platform.processor(),
+                     'count_runs': count_runs, 'seed': seed, 'time_limit': time_limit, 'target_gap': target_gap,
+                     'reduce': reduce},
+            'runs': runs, 'summary': summarize(runs)}
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.1) -> list:
+    regressions = []
+    for key, new in current['summary'].items():
+        old = baseline['summary'].get(key)
+        if old is None:
+            continue
+        for metric in METRICS:
+            if old[metric] is None or new[metric] is None:
+                if old[metric] is not None and metric in ('time_to_target', 'time_to_optimum'):
+                    regressions.append((key, metric, old[metric], new[metric]))
+                continue
+            if metric == 'gap':
+                worse = new[metric] > old[metric]
+            elif LOWER_IS_BETTER[metric]:
+                worse = new[metric] > old[metric] * (1 + tolerance)
+            else:
+                worse = new[metric] < old[metric] * (1 - tolerance)
+            if worse:
+                regressions.append((key, metric, old[metric], new[metric]))
+    return regressions
+
+
+def print_summary(summary: dict) -> None:
+    print(f'{"instance/algorithm":24}{"best":>8}' + ''.join(f'{metric:>24}' for metric in METRICS))
+    for key, values in summary.items():
+        print(f'{key:24}{values["best_cost"]:>8}' + ''.join(f'{str(values[metric]):>24}' for metric in METRICS))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark set covering solvers on the instances in tests/')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run')
+    run_parser.add_argument('-a', '--algorithms', nargs='+', default=['LH', 'SA'], choices=list(ALGORITHMS))
+    run_parser.add_argument('-i', '--instances', nargs='+', default=list(INSTANCES))
+    run_parser.add_argument('-n', '--runs', type=int, default=3)
+    run_parser.add_argument('-s', '--seed', type=int, default=0)
+    run_parser.add_argument('-t', '--time-limit', type=float, default=None)
+    run_parser.add_argument('-g', '--target-gap', type=float, default=0.01)
+    run_parser.add_argument('-w', '--workers', type=int, default=1)
+    run_parser.add_argument('-o', '--output', default=None)
+    run_parser.add_argument('-p', '--profile', action='store_true')
+    run_parser.add_argument('-r', '--reduce', action='store_true')
+    compare_parser = commands.add_parser('compare')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--tolerance', type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        report = run(args.instances, args.algorithms, args.runs, args.seed, args.time_limit, args.target_gap,
+                     args.workers, args.profile, args.reduce)
+        output = args.output or f'data/benchmarks/{time.strftime("%Y%m%d_%H%M%S")}.json'
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print_summary(report['summary'])
+        print(f'Saved to {output}')
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    regressions = compare(baseline, current, args.tolerance)
+    for key, metric, old, new in regressions:
+        print(f'{key}: {metric} {old} -> {new}')
+    print(f'{len(regressions)} regression(s)')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from services.sparse import SparseMatrix
+
+CACHE_DIRECTORY = '.cache'
+CACHE_VERSION = 1
+MATRICES = ('covering_columns', 'rows_to_be_covered')
+PARTS = ('indptr', 'indices', 'major')
+
+
+class InstanceCache:
+    def __init__(self, file: str, loader: str) -> None:
+        with open(file, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:16]
+        name = os.path.splitext(os.path.basename(file))[0]
+        self.path = os.path.join(os.path.dirname(file), CACHE_DIRECTORY, f'{name}_{loader}_v{CACHE_VERSION}_{digest}')
+
+    def load(self, test) -> bool:
+        if not os.path.exists(os.path.join(self.path, 'meta.json')):
+            return False
+        with open(os.path.join(self.path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        test.count_objects_to_be_covered = meta['count_objects_to_be_covered']
+        test.count_covering_objects = meta['count_covering_objects']
+        test.radius = meta['radius']
+        test.map_size = meta['map_size']
+        test.covering_objects_costs = self.__array('covering_objects_costs')
+        test.objects_to_be_covered = list(map(tuple, self.__array('objects_to_be_covered').tolist()))
+        test.covering_objects = list(map(tuple, self.__array('covering_objects').tolist()))
+        counts_minor = (test.count_covering_objects, test.count_objects_to_be_covered)
+        for matrix, count_minor in zip(MATRICES, counts_minor):
+            setattr(test, matrix, SparseMatrix(self.__array(f'{matrix}_indptr'), self.__array(f'{matrix}_indices'),
+                                               count_minor, self.__array(f'{matrix}_major')))
+        return True
+
+    def save(self, test) -> None:
+        try:
+            self.__save(test)
+        except OSError:
+            shutil.rmtree(f'{self.path}.{os.getpid()}', ignore_errors=True)
+
+    def __save(self, test) -> None:
+        temporary_path = f'{self.path}.{os.getpid()}'
+        os.makedirs(temporary_path, exist_ok=True)
+        arrays = {
+            'covering_objects_costs': np.asarray(test.covering_objects_costs, dtype=np.int64),
+            'objects_to_be_covered': np.asarray(test.objects_to_be_covered, dtype=np.int64).reshape(-1, 2),
+            'covering_objects': np.asarray(test.covering_objects, dtype=np.int64).reshape(-1, 2),
+        }
+        for matrix in MATRICES:
+            for part in PARTS:
+                arrays[f'{matrix}_{part}'] = getattr(getattr(test, matrix), part)
+        for name, array in arrays.items():
+            np.save(os.path.join(temporary_path, f'{name}.npy'), array)
+        with open(os.path.join(temporary_path, 'meta.json'), 'w') as f:
+            json.dump({'count_objects_to_be_covered': test.count_objects_to_be_covered,
+                       'count_covering_objects': test.count_covering_objects,
+                       'radius': test.radius, 'map_size': test.map_size}, f)
+        try:
+            os.replace(temporary_path, self.path)
+        except OSError:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+
+    def __array(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
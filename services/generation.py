@@ -1,5 +1,11 @@
+from math import isqrt
 from random import randint
+
+import numpy as np
+
+from services.cache import InstanceCache
 from services.common import DirectoryCreator
+from services.sparse import SparseMatrix
 
 MAP_SIZE = 100
 SIGN_EMPTY = 0
@@ -15,58 +21,75 @@ class Test:
         self.count_covering_objects = 0
         self.objects_to_be_covered = []
         self.covering_objects = []
-        self.coverage_array = [[]]
-        self.covering_objects_costs = []
-        self.covering_columns = [[]]
-        self.rows_to_be_covered = [[]]
-
-    def load_generated_data(self, file: str) -> None:
+        self.covering_objects_costs = np.zeros(0, dtype=np.int64)
+        self.covering_columns = SparseMatrix([0], [], 0)
+        self.rows_to_be_covered = SparseMatrix([0], [], 0)
+
+    def set_coverage(self, covering_columns: list) -> None:
+        self.covering_columns = SparseMatrix.from_lists(covering_columns, self.count_covering_objects)
+        self.rows_to_be_covered = self.covering_columns.transpose()
+
+    def subproblem(self, rows: np.ndarray, columns: np.ndarray) -> 'Test':
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        test = Test(self.map_size)
+        test.radius = self.radius
+        test.count_objects_to_be_covered = len(rows)
+        test.count_covering_objects = len(columns)
+        test.covering_objects_costs = self.covering_objects_costs[columns].copy()
+        if len(self.objects_to_be_covered) != 0:
+            test.objects_to_be_covered = [self.objects_to_be_covered[i] for i in rows.tolist()]
+        if len(self.covering_objects) != 0:
+            test.covering_objects = [self.covering_objects[j] for j in columns.tolist()]
+        row_positions = np.full(self.count_objects_to_be_covered, -1, dtype=np.int64)
+        row_positions[rows] = np.arange(len(rows))
+        column_positions = np.full(self.count_covering_objects, -1, dtype=np.int64)
+        column_positions[columns] = np.arange(len(columns))
+        major = row_positions[self.covering_columns.major]
+        indices = column_positions[self.covering_columns.indices]
+        keep = (major >= 0) & (indices >= 0)
+        order = np.argsort(major[keep], kind='stable')
+        major, indices = major[keep][order], indices[keep][order]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(major, minlength=len(rows)))
+        test.covering_columns = SparseMatrix(indptr, indices, len(columns), major)
+        test.rows_to_be_covered = test.covering_columns.transpose()
+        return test
+
+    def load_generated_data(self, file: str, cache: bool = True) -> None:
+        instance_cache = InstanceCache(file, 'generated') if cache else None
+        if instance_cache is not None and instance_cache.load(self):
+            return
         with open(file, 'r') as f:
-            lines = f.readlines()
-            self.count_objects_to_be_covered, self.count_covering_objects, self.radius, self.map_size = map(int, lines[
-                0].split())
-            self.coverage_array = [list(map(int, x.split())) for x in lines[1:self.count_objects_to_be_covered + 1:]]
-            self.covering_objects_costs = list(map(int, lines[self.count_objects_to_be_covered + 1].split()))
-            begin = self.count_objects_to_be_covered + 2
-            end = begin + self.count_objects_to_be_covered
-            self.objects_to_be_covered = [tuple(map(int, x.split())) for x in lines[begin:end:]]
-            begin = end
-            end = begin + self.count_covering_objects
-            self.covering_objects = [tuple(map(int, x.split())) for x in lines[begin:end:]]
-
-            self.covering_columns: list[list[int]] = [[] for _ in range(self.count_objects_to_be_covered)]
-            self.rows_to_be_covered: list[list[int]] = [[] for _ in range(self.count_covering_objects)]
-            for i in range(self.count_objects_to_be_covered):
-                for j in range(self.count_covering_objects):
-                    if self.coverage_array[i][j] == 1:
-                        self.covering_columns[i].append(j)
-                        self.rows_to_be_covered[j].append(i)
-
-    def load_or_library_data(self, file: str) -> None:
+            self.count_objects_to_be_covered, self.count_covering_objects, self.radius, self.map_size = map(
+                int, f.readline().split())
+            covering_columns = [np.flatnonzero(np.array(f.readline().split(), dtype=np.int8))
+                                for _ in range(self.count_objects_to_be_covered)]
+            self.covering_objects_costs = np.array(f.readline().split(), dtype=np.int64)
+            self.objects_to_be_covered = [tuple(map(int, f.readline().split()))
+                                          for _ in range(self.count_objects_to_be_covered)]
+            self.covering_objects = [tuple(map(int, f.readline().split())) for _ in range(self.count_covering_objects)]
+        self.set_coverage(covering_columns)
+        if instance_cache is not None:
+            instance_cache.save(self)
+
+    def load_or_library_data(self, file: str, cache: bool = True) -> None:
+        instance_cache = InstanceCache(file, 'or_library') if cache else None
+        if instance_cache is not None and instance_cache.load(self):
+            return
         with open(file, 'r') as f:
-            lines = f.readlines()
-            self.count_objects_to_be_covered, self.count_covering_objects = map(int, lines[0].split())
-            self.covering_objects_costs = []
-            line = 1
-            while len(self.covering_objects_costs) != self.count_covering_objects:
-                self.covering_objects_costs += list(map(int, lines[line].split()))
-                line += 1
-            self.coverage_array = [[0] * self.count_covering_objects for _ in range(self.count_objects_to_be_covered)]
-            i = 0
-            self.covering_columns: list[list[int]] = []
-            self.rows_to_be_covered: list[list[int]] = [[] for _ in range(self.count_covering_objects)]
-            while i != self.count_objects_to_be_covered:
-                count = int(lines[line])
-                line += 1
-                columns = []
-                while len(columns) != count:
-                    columns += list(map(lambda x: int(x) - 1, lines[line].split()))
-                    line += 1
-                self.covering_columns.append(columns)
-                for j in columns:
-                    self.rows_to_be_covered[j].append(i)
-                    self.coverage_array[i][j] = 1
-                i += 1
+            tokens = np.array(f.read().split(), dtype=np.int64)
+        self.count_objects_to_be_covered, self.count_covering_objects = map(int, tokens[:2])
+        position = 2 + self.count_covering_objects
+        self.covering_objects_costs = tokens[2:position].copy()
+        covering_columns = []
+        for _ in range(self.count_objects_to_be_covered):
+            count = int(tokens[position])
+            covering_columns.append(tokens[position + 1:position + 1 + count] - 1)
+            position += count + 1
+        self.set_coverage(covering_columns)
+        if instance_cache is not None:
+            instance_cache.save(self)
 
     def save_data(self) -> None:
         DirectoryCreator()
@@ -75,8 +98,8 @@ class Test:
                 'w') as f):
             f.write(' '.join([str(self.count_objects_to_be_covered), str(self.count_covering_objects),
                               str(self.radius), str(self.map_size)]) + '\n')
-            for line in self.coverage_array:
-                f.write(' '.join(map(str, line)) + '\n')
+            for i in range(self.count_objects_to_be_covered):
+                f.write(' '.join(map(str, self.covering_columns.dense_row(i))) + '\n')
             f.write(' '.join(map(str, self.covering_objects_costs)) + '\n')
             for line in self.objects_to_be_covered:
                 f.write(' '.join(map(str, line)) + '\n')
@@ -88,7 +111,7 @@ class GenerateMap(Test):
     def __init__(self, map_size: int, count_objects_to_be_covered: int, count_covering_objects: int,
                  radius: int) -> None:
         super().__init__(map_size)
-        self.__map = [[0] * map_size for _ in range(map_size)]
+        self.__map: dict[tuple, int] = {}
         self.__generate_objects_to_be_covered(count_objects_to_be_covered)
         self.__generate_covering_objects(count_covering_objects)
         self.__generate_covering_objects_costs()
@@ -101,8 +124,8 @@ class GenerateMap(Test):
             x = randint(0, self.map_size - 1)
             y = randint(0, self.map_size - 1)
 
-            if self.__map[y][x] == SIGN_EMPTY:
-                self.__map[y][x] = SIGN_OBJECT_TO_COVERED
+            if self.__map.get((x, y), SIGN_EMPTY) == SIGN_EMPTY:
+                self.__map[(x, y)] = SIGN_OBJECT_TO_COVERED
                 self.objects_to_be_covered.append((x, y))
                 count += 1
 
@@ -113,29 +136,76 @@ class GenerateMap(Test):
             x = randint(0, self.map_size - 1)
             y = randint(0, self.map_size - 1)
 
-            if self.__map[y][x] == SIGN_EMPTY:
-                self.__map[y][x] = SIGN_COVERING_OBJECTS
+            if self.__map.get((x, y), SIGN_EMPTY) == SIGN_EMPTY:
+                self.__map[(x, y)] = SIGN_COVERING_OBJECTS
                 self.covering_objects.append((x, y))
                 count += 1
 
     def __generate_covering_objects_costs(self) -> None:
-        self.covering_objects_costs = [randint(5, 100) for _ in range(self.count_covering_objects)]
+        self.covering_objects_costs = np.array([randint(5, 100) for _ in range(self.count_covering_objects)],
+                                               dtype=np.int64)
 
     def __generate_coverage_array(self, radius: int) -> int:
-        is_valid = False
+        objects_to_be_covered = np.array(self.objects_to_be_covered, dtype=np.int64).reshape(-1, 2)
+        radius = max(radius, self.__minimum_radius(objects_to_be_covered))
+        grid = SpatialGrid(self.covering_objects, max(1, radius), self.map_size)
+        rows = [np.zeros(0, dtype=np.int64)]
+        columns = [np.zeros(0, dtype=np.int64)]
+        for cell, members in grid.group(objects_to_be_covered):
+            candidates = grid.near(cell, 1)
+            i, j = np.nonzero(grid.squared_distances(objects_to_be_covered[members], candidates) <= radius ** 2)
+            rows.append(members[i])
+            columns.append(candidates[j])
+        rows = np.concatenate(rows)
+        columns = np.concatenate(columns)
+        order = np.lexsort((columns, rows))
+        indptr = np.zeros(self.count_objects_to_be_covered + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(rows, minlength=self.count_objects_to_be_covered))
+        self.covering_columns = SparseMatrix(indptr, columns[order], self.count_covering_objects)
+        self.rows_to_be_covered = self.covering_columns.transpose()
+        return radius
 
-        while not is_valid:
-            is_valid = True
-            self.coverage_array = [[0] * self.count_covering_objects for _ in range(self.count_objects_to_be_covered)]
-            for i in range(self.count_objects_to_be_covered):
-                for j in range(self.count_covering_objects):
-                    distance = ((self.covering_objects[j][0] - self.objects_to_be_covered[i][0]) ** 2 +
-                                (self.covering_objects[j][1] - self.objects_to_be_covered[i][1]) ** 2) ** 0.5
-                    if distance <= radius:
-                        self.coverage_array[i][j] = 1
-
-                if 1 not in self.coverage_array[i]:
-                    is_valid = False
-                    radius += 1
+    def __minimum_radius(self, objects_to_be_covered: np.ndarray) -> int:
+        cell_size = max(1, self.map_size // max(1, isqrt(self.count_covering_objects)))
+        grid = SpatialGrid(self.covering_objects, cell_size, self.map_size)
+        max_distance = 0
+        for cell, members in grid.group(objects_to_be_covered):
+            k = 0
+            while True:
+                candidates = grid.near(cell, k)
+                if len(candidates) == 0:
+                    k += 1
+                    continue
+                distances = grid.squared_distances(objects_to_be_covered[members], candidates).min(axis=1)
+                need = isqrt(int(distances.max())) // cell_size + 1
+                if need <= k:
                     break
-        return radius
+                k = need
+            max_distance = max(max_distance, int(distances.max()))
+        radius = isqrt(max_distance)
+        return radius if radius ** 2 == max_distance else radius + 1
+
+
+class SpatialGrid:
+    def __init__(self, points: list, cell_size: int, map_size: int) -> None:
+        self.points = np.array(points, dtype=np.int64).reshape(-1, 2)
+        self.cell_size = cell_size
+        self.width = map_size // cell_size + 1
+        self.cells = dict(self.group(self.points))
+
+    def group(self, points: np.ndarray) -> list:
+        keys = (points[:, 0] // self.cell_size) * self.width + points[:, 1] // self.cell_size
+        order = np.argsort(keys, kind='stable')
+        unique, starts = np.unique(keys[order], return_index=True)
+        return [((int(key) // self.width, int(key) % self.width), members)
+                for key, members in zip(unique, np.split(order, starts[1:]))]
+
+    def near(self, cell: tuple, k: int) -> np.ndarray:
+        x, y = cell
+        parts = [self.cells[(i, j)] for i in range(x - k, x + k + 1) for j in range(y - k, y + k + 1)
+                 if (i, j) in self.cells]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def squared_distances(self, points: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        difference = points[:, None, :] - self.points[candidates][None, :, :]
+        return (difference ** 2).sum(axis=2)
@@ -0,0 +1,83 @@
+import json
+from time import perf_counter
+
+
+class Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'Profiler', name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> 'Phase':
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.profiler.add_time(self.name, perf_counter() - self.start)
+
+
+class NullPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> 'NullPhase':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+NULL_PHASE = NullPhase()
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.times: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        self.counters: dict[str, int] = {}
+
+    def phase(self, name: str) -> Phase:
+        return Phase(self, name)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.times[name] = self.times.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        self.times.clear()
+        self.calls.clear()
+        self.counters.clear()
+
+    def to_dict(self) -> dict:
+        return {'phases': {name: {'time': round(self.times[name], 6), 'calls': self.calls[name]}
+                           for name in sorted(self.times, key=self.times.get, reverse=True)},
+                'counters': dict(sorted(self.counters.items()))}
+
+    def save(self, file: str) -> None:
+        with open(file, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def report(self) -> str:
+        lines = [f'{"phase":24}{"time, s":>12}{"calls":>10}']
+        for name, values in self.to_dict()['phases'].items():
+            lines.append(f'{name:24}{values["time"]:>12.4f}{values["calls"]:>10}')
+        lines += [f'{name:24}{value:>22}' for name, value in self.to_dict()['counters'].items()]
+        return '\n'.join(lines)
+
+
+class NullProfiler(Profiler):
+    def phase(self, name: str) -> NullPhase:
+        return NULL_PHASE
+
+    def add_time(self, name: str, seconds: float) -> None:
+        pass
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+
+NULL_PROFILER = NullProfiler()
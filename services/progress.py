@@ -0,0 +1,64 @@
+from time import monotonic
+
+INTERVAL = 0.5
+
+reporter = None
+
+
+def set_reporter(new_reporter, interval: float = None) -> None:
+    global reporter, INTERVAL
+    reporter = new_reporter
+    if interval is not None:
+        INTERVAL = interval
+
+
+def progress(total: int = None) -> 'Progress | NullProgress':
+    if reporter is None:
+        return NULL_PROGRESS
+    return Progress(reporter, total, INTERVAL)
+
+
+class Progress:
+    def __init__(self, reporter, total: int = None, interval: float = INTERVAL) -> None:
+        self.reporter = reporter
+        self.total = total
+        self.interval = interval
+        self.count = 0
+        self.reported = 0
+        self.next_time = monotonic() + interval
+        self.bar = None
+        if reporter == 'tqdm':
+            from tqdm import tqdm
+            self.bar = tqdm(total=total, colour='GREEN')
+
+    def update(self, n: int = 1) -> None:
+        self.count += n
+        if monotonic() >= self.next_time:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.bar is not None:
+            self.bar.update(self.count - self.reported)
+        else:
+            self.reporter(self.count, self.total)
+        self.reported = self.count
+        self.next_time = monotonic() + self.interval
+
+    def close(self) -> None:
+        if self.count != self.reported:
+            self.flush()
+        if self.bar is not None:
+            self.bar.close()
+
+
+class NullProgress:
+    __slots__ = ()
+
+    def update(self, n: int = 1) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+NULL_PROGRESS = NullProgress()
@@ -0,0 +1,128 @@
+import time
+
+import numpy as np
+
+from services.generation import Test
+
+INF = 100000000000
+
+
+class Reduction:
+    def __init__(self, test: Test) -> None:
+        self.test = test
+        self.costs = np.asarray(test.covering_objects_costs, dtype=np.int64)
+        self.alive_rows = np.ones(test.count_objects_to_be_covered, dtype=bool)
+        self.alive_columns = np.ones(test.count_covering_objects, dtype=bool)
+        self.fixed = np.zeros(test.count_covering_objects, dtype=np.int8)
+        self.rows = np.arange(test.count_objects_to_be_covered)
+        self.columns = np.arange(test.count_covering_objects)
+        self.reduced: Test | None = None
+        self.reduction_time = 0.0
+
+    @property
+    def fixed_cost(self) -> int:
+        return int(self.costs @ self.fixed)
+
+    def reduce(self) -> Test:
+        start_time = time.time()
+        changed = True
+        while changed:
+            changed = self.__fix_essential_columns()
+            changed = self.__remove_dominated_rows() or changed
+            changed = self.__remove_dominated_columns() or changed
+        self.rows = np.flatnonzero(self.alive_rows)
+        self.columns = np.flatnonzero(self.alive_columns)
+        self.reduced = self.test.subproblem(self.rows, self.columns)
+        self.reduction_time = time.time() - start_time
+        return self.reduced
+
+    def restore(self, solution) -> list:
+        original = self.fixed.copy()
+        original[self.columns[np.flatnonzero(np.asarray(solution))]] = 1
+        return original.tolist()
+
+    def start(self, algorithm, *params, optimum=None, **kwargs) -> tuple:
+        if self.reduced is None:
+            self.reduce()
+        if self.reduced.count_objects_to_be_covered == 0:
+            return [self.fixed_cost], [0.0], self.fixed.tolist()
+        if optimum is not None:
+            optimum -= self.fixed_cost
+        result = algorithm(self.reduced).start(*params, optimum=optimum, **kwargs)
+        times = [t + self.reduction_time for t in result[1]]
+        return (self.__shift(result[0]), times, *result[2:-1], self.restore(result[-1]))
+
+    def __fix_essential_columns(self) -> bool:
+        counts = self.test.covering_columns.count(self.alive_columns)
+        if (counts[self.alive_rows] == 0).any():
+            raise ValueError('Instance is infeasible: some object cannot be covered')
+        essential = np.flatnonzero(self.alive_rows & (counts == 1))
+        if len(essential) == 0:
+            return False
+        for i in essential.tolist():
+            if not self.alive_rows[i]:
+                continue
+            columns = self.test.covering_columns[i]
+            j = int(columns[self.alive_columns[columns]][0])
+            self.fixed[j] = 1
+            self.alive_columns[j] = False
+            self.alive_rows[self.test.rows_to_be_covered[j]] = False
+        return True
+
+    def __remove_dominated_rows(self) -> bool:
+        removed = False
+        rows = np.flatnonzero(self.alive_rows)
+        lengths = self.test.covering_columns.count(self.alive_columns)
+        for k in rows[np.argsort(lengths[rows], kind='stable')].tolist():
+            if not self.alive_rows[k]:
+                continue
+            columns = self.test.covering_columns[k]
+            columns = columns[self.alive_columns[columns]]
+            candidates = np.concatenate([self.test.rows_to_be_covered[j] for j in columns.tolist()])
+            counts = np.bincount(candidates, minlength=self.test.count_objects_to_be_covered)
+            dominated = (counts == len(columns)) & self.alive_rows
+            dominated[k] = False
+            if dominated.any():
+                self.alive_rows[dominated] = False
+                removed = True
+        return removed
+
+    def __remove_dominated_columns(self) -> bool:
+        removed = False
+        empty = self.alive_columns & (self.test.rows_to_be_covered.count(self.alive_rows) == 0)
+        if empty.any():
+            self.alive_columns[empty] = False
+            removed = True
+        best, second = {}, {}
+        for i in np.flatnonzero(self.alive_rows).tolist():
+            best[i], second[i] = self.__two_cheapest(i)
+        columns = np.flatnonzero(self.alive_columns)
+        for j in columns[np.argsort(-self.costs[columns], kind='stable')].tolist():
+            rows = self.test.rows_to_be_covered[j]
+            rows = rows[self.alive_rows[rows]].tolist()
+            replacement = 0
+            for i in rows:
+                replacement += best[i][0] if best[i][1] != j else second[i][0]
+                if replacement > self.costs[j]:
+                    break
+            if replacement > self.costs[j]:
+                continue
+            self.alive_columns[j] = False
+            removed = True
+            for i in rows:
+                if j in (best[i][1], second[i][1]):
+                    best[i], second[i] = self.__two_cheapest(i)
+        return removed
+
+    def __two_cheapest(self, i: int) -> tuple:
+        columns = self.test.covering_columns[i]
+        columns = columns[self.alive_columns[columns]]
+        order = np.argsort(self.costs[columns], kind='stable')[:2]
+        pairs = [(int(self.costs[columns[k]]), int(columns[k])) for k in order]
+        pairs += [(INF, -1)] * (2 - len(pairs))
+        return pairs[0], pairs[1]
+
+    def __shift(self, results: list) -> list:
+        if len(results) != 0 and isinstance(results[0], list):
+            return [self.__shift(part) for part in results]
+        return [int(result) + self.fixed_cost for result in results]
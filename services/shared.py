@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from services.generation import Test
+from services.sparse import SparseMatrix
+
+MATRICES = ('covering_columns', 'rows_to_be_covered')
+PARTS = ('indptr', 'indices', 'major')
+ALIGNMENT = 64
+
+
+class SharedTest(Test):
+    def __init__(self, name: str, layout: list, meta: dict, owner: bool = False) -> None:
+        super().__init__(meta['map_size'])
+        self.radius = meta['radius']
+        self.count_objects_to_be_covered = meta['count_objects_to_be_covered']
+        self.count_covering_objects = meta['count_covering_objects']
+        self.layout = layout
+        self.meta = meta
+        self.owner = owner
+        self.memory = shared_memory.SharedMemory(name=name)
+        arrays = {key: np.ndarray(shape, dtype=dtype, buffer=self.memory.buf, offset=offset)
+                  for key, dtype, shape, offset in layout}
+        for array in arrays.values():
+            array.flags.writeable = False
+        self.covering_objects_costs = arrays['covering_objects_costs']
+        self.objects_to_be_covered = arrays['objects_to_be_covered']
+        self.covering_objects = arrays['covering_objects']
+        counts_minor = (self.count_covering_objects, self.count_objects_to_be_covered)
+        for matrix, count_minor in zip(MATRICES, counts_minor):
+            setattr(self, matrix, SparseMatrix(arrays[f'{matrix}_indptr'], arrays[f'{matrix}_indices'], count_minor,
+                                               arrays[f'{matrix}_major']))
+
+    @classmethod
+    def create(cls, test: Test) -> 'SharedTest':
+        arrays = {
+            'covering_objects_costs': np.asarray(test.covering_objects_costs, dtype=np.int64),
+            'objects_to_be_covered': np.asarray(test.objects_to_be_covered, dtype=np.int64).reshape(-1, 2),
+            'covering_objects': np.asarray(test.covering_objects, dtype=np.int64).reshape(-1, 2),
+        }
+        for matrix in MATRICES:
+            for part in PARTS:
+                arrays[f'{matrix}_{part}'] = getattr(getattr(test, matrix), part)
+        layout = []
+        size = 0
+        for key, array in arrays.items():
+            layout.append((key, array.dtype.str, array.shape, size))
+            size += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+        memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for (key, dtype, shape, offset), array in zip(layout, arrays.values()):
+            np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=offset)[...] = array
+        meta = {'map_size': test.map_size, 'radius': test.radius,
+                'count_objects_to_be_covered': test.count_objects_to_be_covered,
+                'count_covering_objects': test.count_covering_objects}
+        shared = cls(memory.name, layout, meta, owner=True)
+        memory.close()
+        return shared
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def __reduce__(self) -> tuple:
+        return SharedTest, (self.memory.name, self.layout, self.meta)
+
+    def close(self) -> None:
+        self.covering_objects_costs = self.objects_to_be_covered = self.covering_objects = None
+        self.covering_columns = self.rows_to_be_covered = None
+        try:
+            self.memory.close()
+        except BufferError:
+            pass
+        if self.owner:
+            self.memory.unlink()
+
+
+@contextmanager
+def shared(test: Test):
+    if isinstance(test, SharedTest):
+        yield test
+        return
+    shared_test = SharedTest.create(test)
+    try:
+        yield shared_test
+    finally:
+        shared_test.close()
@@ -0,0 +1,54 @@
+import numpy as np
+
+
+class SparseMatrix:
+    def __init__(self, indptr, indices, count_minor: int, major=None) -> None:
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.count_minor = count_minor
+        if major is None:
+            major = np.repeat(np.arange(len(self.indptr) - 1, dtype=np.int32), np.diff(self.indptr))
+        self.major = np.asarray(major, dtype=np.int32)
+
+    @classmethod
+    def from_lists(cls, lists: list, count_minor: int) -> 'SparseMatrix':
+        indptr = np.zeros(len(lists) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(x) for x in lists])
+        indices = np.concatenate([np.asarray(x, dtype=np.int32) for x in lists]) if lists else []
+        return cls(indptr, indices, count_minor)
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def transpose(self) -> 'SparseMatrix':
+        order = np.argsort(self.indices, kind='stable')
+        indptr = np.zeros(self.count_minor + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(self.indices, minlength=self.count_minor))
+        return SparseMatrix(indptr, self.major[order], len(self))
+
+    def count(self, mask) -> np.ndarray:
+        mask = np.asarray(mask, dtype=bool)
+        return np.bincount(self.major[mask[self.indices]], minlength=len(self))
+
+    def dot(self, vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float64)
+        return np.bincount(self.major, weights=vector[self.indices], minlength=len(self))
+
+    def dense_row(self, i: int) -> np.ndarray:
+        row = np.zeros(self.count_minor, dtype=np.int8)
+        row[self[i]] = 1
+        return row
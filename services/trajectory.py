@@ -0,0 +1,67 @@
+from array import array
+
+import numpy as np
+
+
+class Trajectory:
+    def __init__(self, count_columns: int) -> None:
+        self.count_columns = count_columns
+        self.initial = np.zeros(count_columns, dtype=np.int8)
+        self.current = np.zeros(count_columns, dtype=np.int8)
+        self.offsets = array('q', [0])
+        self.changes = array('i')
+
+    def record(self, mask) -> None:
+        mask = np.asarray(mask, dtype=np.int8)
+        if len(self) == 0:
+            self.initial[:] = mask
+            self.current[:] = mask
+            self.offsets.append(0)
+            return
+        flipped = np.flatnonzero(mask != self.current)
+        self.current[flipped] = mask[flipped]
+        self.changes.extend(flipped.astype(np.int32).tolist())
+        self.offsets.append(len(self.changes))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('trajectory index out of range')
+        changes = self.__changes(self.offsets[i + 1])
+        flips = np.bincount(changes, minlength=self.count_columns) % 2
+        return self.initial ^ flips.astype(np.int8)
+
+    def __iter__(self):
+        frame = self.initial.copy()
+        changes = self.__changes(len(self.changes))
+        for i in range(len(self)):
+            flipped = changes[self.offsets[i]:self.offsets[i + 1]]
+            frame[flipped] ^= 1
+            yield frame.copy()
+
+    def costs(self, costs) -> list[int]:
+        costs = np.asarray(costs, dtype=np.int64)
+        changes = self.__changes(len(self.changes))
+        frame = self.initial.copy()
+        cost = int(costs @ frame)
+        result = []
+        for i in range(len(self)):
+            flipped = changes[self.offsets[i]:self.offsets[i + 1]]
+            cost += int(costs[flipped] @ (1 - 2 * frame[flipped].astype(np.int64)))
+            frame[flipped] ^= 1
+            result.append(cost)
+        return result
+
+    @property
+    def nbytes(self) -> int:
+        return (self.initial.nbytes + self.current.nbytes + self.offsets.itemsize * len(self.offsets) +
+                self.changes.itemsize * len(self.changes))
+
+    def __changes(self, count: int) -> np.ndarray:
+        if count == 0:
+            return np.zeros(0, dtype=np.int32)
+        return np.frombuffer(self.changes, dtype=np.int32, count=count).copy()
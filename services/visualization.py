@@ -1,9 +1,19 @@
-from PIL import Image, ImageDraw
+import numpy as np
+from PIL import GifImagePlugin, Image, ImageDraw
 
 from services.common import DirectoryCreator
 from services.generation import Test
+from services.trajectory import Trajectory
 
 IMAGE_SIZE = 2000
+BACKGROUND_COLOR = (93, 161, 48, 255)
+RANGE_COLOR = (93, 161, 48, 50)
+OUTLINE_COLOR = (0, 0, 0)
+MAX_OVERLAPS = 64
+MIN_SPRITE_SIZE = 4
+RASTER_RANGE_COLOR = (40, 70, 170)
+RASTER_RANGE_OPACITY = 0.2
+RASTER_OBJECT_COLOR = (220, 30, 30)
 
 
 class VisualizeMap:
@@ -18,67 +28,204 @@ class VisualizeMap:
         self.sprite_covering_object = Image.open('services/assets/covering_object.png').convert("RGBA").resize(
             (self.sprite_size, self.sprite_size))
 
+        self.circle_fill, self.circle_outline = self.__create_circle()
+        self.fill_counts = np.zeros((image_size, image_size), dtype=np.int32)
+        self.outline_counts = np.zeros((image_size, image_size), dtype=np.int32)
+        self.colors, self.outline_colors = self.__create_colors()
+        self.foreground = self.__create_foreground()
+        self.mask = np.zeros(self.test.count_covering_objects, dtype=bool)
+        self.frame = np.zeros((image_size, image_size, 3), dtype=np.uint8)
+        self.__render((0, image_size, 0, image_size))
+
     def save_image(self, mask: list[int]) -> Image:
-        map_image = Image.new("RGBA", (self.image_size, self.image_size), (93, 161, 48, 255))
-
-        self.__visualize_ranges(map_image, [i for i, v in enumerate(mask) if v == 1])
-        self.__visualize_covering_objects(map_image)
-        self.__visualize_objects_to_be_covered(map_image)
-
-        # map_image.show()
-
-        return map_image
-
-    def __visualize_ranges(self, map_image: Image, indexes: list[int]) -> None:
-        circle = Image.new('RGBA',
-                           size=(
-                               2 * self.test.radius * self.sprite_size + 1,
-                               2 * self.test.radius * self.sprite_size + 1),
-                           color=(0, 0, 0, 0))
-        draw_circle = ImageDraw.Draw(circle)
-
-        for i in indexes:
-            x = self.test.covering_objects[i][0]
-            y = self.test.covering_objects[i][1]
-            draw_circle.ellipse(
-                (0, 0, 2 * self.test.radius * self.sprite_size, 2 * self.test.radius * self.sprite_size),
-                fill=(93, 161, 48, 50),
-                outline=(0, 0, 0), width=5)
-            map_image.paste(circle,
-                            ((x - self.test.radius) * self.sprite_size, (y - self.test.radius) * self.sprite_size),
-                            circle)
-
-    def __visualize_covering_objects(self, map_image: Image) -> None:
-        for i in range(self.test.count_covering_objects):
-            x = self.test.covering_objects[i][0]
-            y = self.test.covering_objects[i][1]
-            map_image.paste(self.sprite_covering_object, (x * self.sprite_size, y * self.sprite_size),
-                            self.sprite_covering_object)
-
-    def __visualize_objects_to_be_covered(self, map_image: Image) -> None:
-        for i in range(self.test.count_objects_to_be_covered):
-            x = self.test.objects_to_be_covered[i][0]
-            y = self.test.objects_to_be_covered[i][1]
-            map_image.paste(self.sprite_objects_to_be_covered, (x * self.sprite_size, y * self.sprite_size),
-                            self.sprite_objects_to_be_covered)
-
-
-class Video(VisualizeMap):
+        mask = np.asarray(mask, dtype=bool)
+        boxes = [self.__visualize_range(j, 1 if mask[j] else -1) for j in np.flatnonzero(mask != self.mask)]
+        for box in boxes:
+            if box is not None:
+                self.__render(box)
+        self.mask = mask
+
+        # Image.fromarray(self.frame).show()
+
+        return Image.fromarray(self.frame.copy())
+
+    def __create_circle(self) -> tuple:
+        size = 2 * self.test.radius * self.sprite_size + 1
+        circle = Image.new('L', size=(size, size), color=0)
+        ImageDraw.Draw(circle).ellipse((0, 0, size - 1, size - 1), fill=1, outline=2, width=5)
+        circle = np.array(circle)
+        return (circle == 1).astype(np.int32), (circle == 2).astype(np.int32)
+
+    @staticmethod
+    def __create_colors() -> tuple:
+        background = np.array(BACKGROUND_COLOR[:3], dtype=np.float64)
+        fill = np.array(RANGE_COLOR[:3], dtype=np.float64)
+        outline = np.array(OUTLINE_COLOR, dtype=np.float64)
+        transparency = (1 - RANGE_COLOR[3] / 255) ** np.arange(MAX_OVERLAPS + 1)[:, None]
+        return fill + (background - fill) * transparency, fill + (outline - fill) * transparency
+
+    def __create_foreground(self) -> np.ndarray:
+        foreground = Image.new('RGBA', (self.image_size, self.image_size), (0, 0, 0, 0))
+        for x, y in self.test.covering_objects:
+            foreground.alpha_composite(self.sprite_covering_object, (x * self.sprite_size, y * self.sprite_size))
+        for x, y in self.test.objects_to_be_covered:
+            foreground.alpha_composite(self.sprite_objects_to_be_covered, (x * self.sprite_size, y * self.sprite_size))
+        return np.array(foreground)
+
+    def __visualize_range(self, j: int, sign: int) -> tuple | None:
+        x, y = self.test.covering_objects[j]
+        top = (y - self.test.radius) * self.sprite_size
+        left = (x - self.test.radius) * self.sprite_size
+        size = len(self.circle_fill)
+        y0, y1 = max(top, 0), min(top + size, self.image_size)
+        x0, x1 = max(left, 0), min(left + size, self.image_size)
+        if y0 >= y1 or x0 >= x1:
+            return None
+        self.fill_counts[y0:y1, x0:x1] += sign * self.circle_fill[y0 - top:y1 - top, x0 - left:x1 - left]
+        self.outline_counts[y0:y1, x0:x1] += sign * self.circle_outline[y0 - top:y1 - top, x0 - left:x1 - left]
+        return y0, y1, x0, x1
+
+    def __render(self, box: tuple) -> None:
+        y0, y1, x0, x1 = box
+        fill_counts = np.minimum(self.fill_counts[y0:y1, x0:x1], MAX_OVERLAPS)
+        base = np.where((self.outline_counts[y0:y1, x0:x1] > 0)[:, :, None],
+                        self.outline_colors[fill_counts], self.colors[fill_counts])
+        foreground = self.foreground[y0:y1, x0:x1]
+        alpha = foreground[:, :, 3:] / 255
+        self.frame[y0:y1, x0:x1] = np.rint(foreground[:, :, :3] * alpha + base * (1 - alpha)).astype(np.uint8)
+
+
+class RasterMap:
     def __init__(self, image_size: int, test: Test):
-        super().__init__(image_size, test)
+        self.image_size = image_size
+        self.test = test
 
-    def create_video(self, masks: list[list[int]], file_name: str) -> None:
-        frames = []
+        scale = image_size / self.test.map_size
+        self.objects_to_be_covered = self.__to_pixels(self.test.objects_to_be_covered, scale)
+        self.covering_objects = self.__to_pixels(self.test.covering_objects, scale)
+        self.disk_radius = round(self.test.radius * scale)
+        y, x = np.ogrid[-self.disk_radius:self.disk_radius + 1, -self.disk_radius:self.disk_radius + 1]
+        self.disk = (x ** 2 + y ** 2 <= self.disk_radius ** 2).astype(np.int32)
+        background = np.array(BACKGROUND_COLOR[:3], dtype=np.float64)
+        tint = np.array(RASTER_RANGE_COLOR, dtype=np.float64)
+        opacity = 1 - (1 - RASTER_RANGE_OPACITY) ** np.arange(MAX_OVERLAPS + 1)[:, None]
+        self.colors = background * (1 - opacity) + tint * opacity
+
+    def save_image(self, mask: list[int]) -> Image:
+        return Image.fromarray(self.render_tile(mask, 0, 0, self.image_size, self.image_size))
+
+    def save_tiles(self, mask: list[int], tile_size: int, path: str) -> list[str]:
+        files = []
+        for top in range(0, self.image_size, tile_size):
+            for left in range(0, self.image_size, tile_size):
+                tile = self.render_tile(mask, top, left, min(tile_size, self.image_size - top),
+                                        min(tile_size, self.image_size - left))
+                files.append(f'{path}/tile_{top // tile_size}_{left // tile_size}.png')
+                Image.fromarray(tile).save(files[-1])
+        return files
+
+    def render_tile(self, mask: list[int], top: int, left: int, height: int, width: int) -> np.ndarray:
+        counts = np.zeros((height, width), dtype=np.int32)
+        centers = self.covering_objects[np.flatnonzero(np.asarray(mask, dtype=bool))]
+        r = self.disk_radius
+        near = ((centers[:, 0] + r >= left) & (centers[:, 0] - r < left + width) &
+                (centers[:, 1] + r >= top) & (centers[:, 1] - r < top + height))
+        for x, y in centers[near].tolist():
+            y0, y1 = max(y - r, top), min(y + r + 1, top + height)
+            x0, x1 = max(x - r, left), min(x + r + 1, left + width)
+            disk = self.disk[y0 - y + r:y1 - y + r, x0 - x + r:x1 - x + r]
+            counts[y0 - top:y1 - top, x0 - left:x1 - left] += disk
+        image = self.colors[np.minimum(counts, MAX_OVERLAPS)]
+        self.__draw_points(image, self.covering_objects, top, left, OUTLINE_COLOR)
+        self.__draw_points(image, self.objects_to_be_covered, top, left, RASTER_OBJECT_COLOR)
+        return np.rint(image).astype(np.uint8)
+
+    @staticmethod
+    def __to_pixels(points: list, scale: float) -> np.ndarray:
+        return np.floor(np.array(points, dtype=np.float64).reshape(-1, 2) * scale).astype(np.int64)
+
+    @staticmethod
+    def __draw_points(image: np.ndarray, points: np.ndarray, top: int, left: int, color: tuple) -> None:
+        height, width = image.shape[:2]
+        inside = ((points[:, 0] >= left) & (points[:, 0] < left + width) &
+                  (points[:, 1] >= top) & (points[:, 1] < top + height))
+        pixels = (points[inside, 1] - top) * width + points[inside, 0] - left
+        density = np.bincount(pixels, minlength=height * width).reshape(height, width)
+        if density.max(initial=0) == 0:
+            return
+        opacity = (0.5 + 0.5 * np.log1p(density) / np.log1p(density.max())) * (density > 0)
+        image[:] = image * (1 - opacity[:, :, None]) + np.array(color, dtype=np.float64) * opacity[:, :, None]
+
+
+def create_map(image_size: int, test: Test) -> VisualizeMap | RasterMap:
+    if image_size // test.map_size >= MIN_SPRITE_SIZE:
+        return VisualizeMap(image_size, test)
+    return RasterMap(image_size, test)
+
+
+class Video:
+    def __init__(self, image_size: int, test: Test):
+        self.test = test
+        self.map = create_map(image_size, test)
+
+    def create_video(self, masks: list[list[int]] | Trajectory, file_name: str, times: list[float] = None,
+                     stride: int = 1, time_stride: float = None) -> None:
         test_name = f'test_{self.test.count_objects_to_be_covered}_{self.test.count_covering_objects}_{self.test.radius}'
-        masks = masks[:masks.index(
-            min(masks, key=lambda x: sum([a * b for a, b in zip(x, self.test.covering_objects_costs)]))) + 1]
-        for mask in masks:
-            frames.append(self.save_image(mask))
+        if times is not None:
+            times = times[len(times) - len(masks):]
+        if isinstance(masks, Trajectory):
+            costs = masks.costs(self.test.covering_objects_costs)
+        else:
+            costs = [int(np.dot(mask, self.test.covering_objects_costs)) for mask in masks]
+        count_frames = costs.index(min(costs)) + 1
         path = DirectoryCreator().new_directory('videos', test_name)
-        frames[0].save(f'{path}/{file_name}.gif', save_all=True, append_images=frames[1:], optimize=True,
-                       duration=[150] * (len(frames) - 1) + [10000], loop=0)
+        gif = GifWriter(f'{path}/{file_name}.gif')
+        frame = None
+        previous_mask = None
+        previous_time = None
+        for i, mask in enumerate(masks):
+            if i == count_frames:
+                break
+            is_last = i == count_frames - 1
+            if not is_last and i % stride != 0:
+                continue
+            if (not is_last and time_stride is not None and times is not None and previous_time is not None and
+                    times[i] - previous_time < time_stride):
+                continue
+            if previous_mask is not None and np.array_equal(mask, previous_mask):
+                continue
+            if frame is not None:
+                gif.write(frame, 150)
+            frame = self.map.save_image(mask)
+            previous_mask = np.array(mask)
+            previous_time = times[i] if times is not None else None
+        gif.write(frame, 10000)
+        gif.close()
         path = DirectoryCreator().new_directory('maps', test_name)
-        frames[-1].save(f'{path}/{file_name}.png')
+        frame.save(f'{path}/{file_name}.png')
+
+
+class GifWriter:
+    def __init__(self, file: str) -> None:
+        self.file = open(file, 'wb')
+        self.palette: Image.Image | None = None
+
+    def write(self, frame: Image.Image, duration: int) -> None:
+        frame = frame.convert('RGB')
+        if self.palette is None:
+            frame = frame.quantize()
+            self.palette = frame
+            header, _ = GifImagePlugin.getheader(frame, info={'loop': 0, 'duration': duration})
+            self.file.write(b''.join(header))
+        else:
+            frame = frame.quantize(palette=self.palette)
+        for data in GifImagePlugin.getdata(frame, duration=duration):
+            self.file.write(data)
+
+    def close(self) -> None:
+        self.file.write(b';')
+        self.file.close()
+
 
 # visualize_map = VisualizeMap(IMAGE_SIZE, FILE)
 # visualize_map.save_image([0] * 50)
@@ -0,0 +1,43 @@
+import os
+import random
+
+import numpy as np
+
+from algorithms.local_search import LocalSearch
+from services.generation import Test as Instance
+
+
+def make_test(covering_columns: list, costs: list) -> Instance:
+    test = Instance()
+    test.count_objects_to_be_covered = len(covering_columns)
+    test.count_covering_objects = len(costs)
+    test.covering_objects_costs = np.array(costs, dtype=np.int64)
+    test.set_coverage(covering_columns)
+    return test
+
+
+def test_descend_terminates_after_failed_add_and_drop():
+    local_search = LocalSearch(make_test([[0, 1], [0, 2], [1, 2]], [10, 8, 5]))
+    local_search.set_solution([0, 1, 1])
+    local_search.descend()
+    assert local_search.x == [0, 1, 1]
+    assert local_search.cost == 13
+    assert len(local_search.dirty) == 0
+
+
+def test_descend_leaves_no_redundant_columns_after_kicks():
+    random.seed(0)
+    test = Instance()
+    test.load_generated_data(os.path.join(os.path.dirname(__file__), 'test1.txt'))
+    local_search = LocalSearch(test)
+    local_search.set_solution(np.zeros(test.count_covering_objects, dtype=np.int8))
+    local_search.descend()
+    for _ in range(300):
+        local_search.kick(3)
+        local_search.descend()
+        x = np.array(local_search.x)
+        cover = test.covering_columns.count(x)
+        assert local_search.cover == cover.tolist()
+        assert local_search.cost == int(test.covering_objects_costs @ x)
+        assert (cover > 0).all()
+        assert [j for j in np.flatnonzero(x) if local_search.drop_loss[j] == 0] == []
@@ -0,0 +1,42 @@
+import os
+import random
+
+import numpy as np
+
+from algorithms.repair import Repair
+from services.generation import Test as Instance
+
+DIRECTORY = os.path.dirname(__file__)
+
+
+def load(name: str) -> Instance:
+    test = Instance()
+    test.load_generated_data(os.path.join(DIRECTORY, f'{name}.txt'))
+    return test
+
+
+def redundant(test: Instance, solution: np.ndarray, counts: np.ndarray) -> list:
+    return [j for j in np.flatnonzero(solution).tolist() if (counts[test.rows_to_be_covered[j]] >= 2).all()]
+
+
+def test_move_and_undo_keep_counts_and_a_minimal_cover():
+    random.seed(0)
+    test = load('test1')
+    repair = Repair(test)
+    solution = repair.fix(np.zeros(test.count_covering_objects))
+    counts = test.covering_columns.count(solution)
+    energy = int(test.covering_objects_costs @ solution)
+    for _ in range(500):
+        columns = random.sample(range(test.count_covering_objects), random.randint(1, 2))
+        changed = repair.move(solution, counts, columns)
+        flipped, flips = np.unique(changed, return_counts=True)
+        flipped = flipped[flips % 2 == 1]
+        delta = int(test.covering_objects_costs[flipped] @ (2 * solution[flipped].astype(np.int64) - 1))
+        if random.random() < 0.5:
+            energy += delta
+        else:
+            repair.undo(solution, counts, changed)
+        assert (counts == test.covering_columns.count(solution)).all()
+        assert energy == int(test.covering_objects_costs @ solution)
+        assert (counts > 0).all()
+        assert redundant(test, solution, counts) == []